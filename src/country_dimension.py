@@ -0,0 +1,209 @@
+# Import libraries
+import numpy as np  # linear algebra
+import pandas as pd  # data processing
+
+
+class CountryDimension:
+    """
+    Country dimension giving every standardized Olympic country one integer id.
+
+    The ids are resolved from three kinds of keys:
+    - 'name': standardized country names, Olympic team names and the spellings of the other
+      datasets listed in name_aliases (World Bank, World Happiness, ISO 3166)
+    - 'ioc': IOC 3-letter codes of the Olympic teams
+    - 'iso': ISO 3166 alpha-3 codes, as used by the World Bank, once added with add_codes
+
+    IOC and ISO codes are kept apart because the same code can name different countries
+    (BRN is Bahrain for the IOC and Brunei for ISO). Datasets are mapped to ids with one lookup per
+    distinct value, and merges between datasets run on the integer 'country_id' column instead of
+    on differently spelled country name strings.
+    """
+
+    # Spellings used by the other datasets mapped to the standardized Olympic country names
+    name_aliases = {
+        'United Kingdom': 'Great Britain',
+        'Russian Federation': 'Russia',
+        'Czechia': 'Czech Republic',
+        'Turkiye': 'Turkey',
+        'Türkiye': 'Turkey',
+        'Korea, Rep.': 'South Korea',
+        'Korea, Republic of (South Korea)': 'South Korea',
+        "Korea, Dem. People's Rep.": 'North Korea',
+        "Korea, Democratic People's Republic of": 'North Korea',
+        'Iran, Islamic Rep.': 'Iran',
+        'Egypt, Arab Rep.': 'Egypt',
+        'Kyrgyz Republic': 'Kyrgyzstan',
+        'Slovak Republic': 'Slovakia',
+        'Venezuela, RB': 'Venezuela',
+        'Viet Nam': 'Vietnam',
+        'Bahamas, The': 'Bahamas',
+        "Cote d'Ivoire": "Côte d'Ivoire",
+        'Ivory Coast': "Côte d'Ivoire",
+        'Hong Kong': 'Hong Kong, China',
+        'Hong Kong SAR, China': 'Hong Kong, China',
+        'Hong Kong S.A.R. of China': 'Hong Kong, China',
+        'Taiwan': 'Chinese Taipei',
+        'Taiwan Province of China': 'Chinese Taipei',
+        'Moldova': 'Republic of Moldova',
+        'Moldova, Republic of': 'Republic of Moldova',
+        'Tanzania': 'United Republic of Tanzania',
+        'Tanzania, United Republic of': 'United Republic of Tanzania',
+        'Syria': 'Syrian Arab Republic',
+        'Virgin Islands (U.S.)': 'Virgin Islands, US',
+        'Virgin Islands, U.S.': 'Virgin Islands, US'
+    }
+
+    # Kinds of keys resolved to country ids
+    key_kinds: list[str] = ['name', 'ioc', 'iso']
+
+    def __init__(
+            self,
+            df: pd.DataFrame,
+            name_col: str = 'country_name',
+            code_col: str = 'country_3_letter_code',
+            code_to_name_map: dict | None = None,
+            aliases: dict | None = None):
+        """
+        Builds the dimension from the Olympic teams.
+
+        Parameters:
+            df (pd.DataFrame): Rows with an Olympic team name and its IOC code, for example
+                get_country_name_codes() or the medals_by_country aggregate. Duplicate rows are ignored.
+            name_col (str, optional): The team name column. Defaults to 'country_name'.
+            code_col (str, optional): The IOC code column. Defaults to 'country_3_letter_code'.
+            code_to_name_map (dict, optional): IOC codes whose teams belong to another standardized
+                country, for example {'URS': 'Russia'}. Defaults to None.
+            aliases (dict, optional): More spellings mapped to team or standardized names,
+                added to name_aliases. Defaults to None.
+        """
+        code_to_name_map = code_to_name_map or {}
+        df_teams = df[[name_col, code_col]].drop_duplicates().dropna()
+        team_names = df_teams[name_col].astype(str).to_numpy()
+        team_codes = df_teams[code_col].astype(str).to_numpy()
+        std_names = np.array([code_to_name_map.get(code, name) for name, code in zip(team_names, team_codes)],
+                             dtype=object)
+
+        # Ids follow the sorted standardized names
+        country_ids, names = pd.factorize(std_names, sort=True)
+        self.countries = pd.DataFrame({'country_id': np.arange(len(names)), 'country_name': names})
+        self.teams = pd.DataFrame({
+            'country_3_letter_code': team_codes,
+            'team_name': team_names,
+            'country_id': country_ids
+        }).sort_values('country_3_letter_code', ignore_index=True)
+
+        self._keys: dict[str, dict] = {kind: {} for kind in self.key_kinds}
+        self._add_keys('name', names, np.arange(len(names)))
+        self._add_keys('name', team_names, country_ids)
+        self._add_keys('ioc', team_codes, country_ids)
+        for alias, name in {**self.name_aliases, **(aliases or {})}.items():
+            country_id = self._keys['name'].get(self._normalize('name', name))
+            if country_id is not None:
+                self._add_keys('name', [alias], [country_id])
+
+    def __len__(self) -> int:
+        """
+        Returns the number of countries.
+        """
+        return len(self.countries)
+
+    @staticmethod
+    def _normalize(kind: str, value) -> str:
+        """
+        Returns the lookup key of a name (case insensitive) or code (upper case).
+        """
+        value = str(value).strip()
+        return value.casefold() if kind == 'name' else value.upper()
+
+    def _add_keys(self, kind: str, values, country_ids):
+        """
+        Adds keys of the given kind, keeping the id of a key that is already known.
+        """
+        lookup = self._keys[kind]
+        for value, country_id in zip(values, country_ids):
+            lookup.setdefault(self._normalize(kind, value), int(country_id))
+
+    def add_codes(self, names, codes, kind: str = 'iso') -> int:
+        """
+        Learns the codes of the countries whose names resolve, for example from the ISO 3166 table
+        or the World Bank 'Country Name' and 'Country Code' columns.
+
+        Parameters:
+            names (array-like): The country names.
+            codes (array-like): The code of each name.
+            kind (str, optional): The kind of the codes. Defaults to 'iso'.
+
+        Returns:
+            int: The number of codes added.
+        """
+        country_ids = self.ids(names, 'name')
+        codes = pd.Series(codes).to_numpy()
+        is_known = (country_ids >= 0) & pd.notna(codes)
+        size = len(self._keys[kind])
+        self._add_keys(kind, codes[is_known], country_ids[is_known])
+        return len(self._keys[kind]) - size
+
+    def ids(self, values, kind: str = 'name') -> np.ndarray:
+        """
+        Maps values to country ids with one lookup per distinct value.
+
+        Parameters:
+            values (array-like): Country names or codes.
+            kind (str, optional): The kind of the values, one of key_kinds. Defaults to 'name'.
+
+        Returns:
+            np.ndarray: The country id of each value, -1 for missing or unknown values.
+
+        Raises:
+            ValueError: If the kind is not one of key_kinds.
+        """
+        if kind not in self._keys:
+            raise ValueError(f"Unknown key kind '{kind}', expected one of {self.key_kinds}")
+        codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=True)
+        lookup = self._keys[kind]
+        # The extra trailing -1 is picked by the -1 code of missing values
+        unique_ids = np.array([lookup.get(self._normalize(kind, value), -1) for value in uniques] + [-1],
+                              dtype=np.int64)
+        return unique_ids[codes]
+
+    def add_ids(
+            self,
+            df: pd.DataFrame,
+            name_col: str | None = None,
+            code_col: str | None = None,
+            kind: str = 'iso',
+            id_col: str = 'country_id') -> pd.DataFrame:
+        """
+        Returns the DataFrame with a country id column, resolved from the code column first and from
+        the name column for the rows whose code is unknown.
+
+        Parameters:
+            df (pd.DataFrame): The DataFrame.
+            name_col (str, optional): The country name column. Defaults to None.
+            code_col (str, optional): The country code column. Defaults to None.
+            kind (str, optional): The kind of the codes in code_col. Defaults to 'iso'.
+            id_col (str, optional): The name of the id column. Defaults to 'country_id'.
+
+        Returns:
+            pd.DataFrame: A copy of df with the id column, -1 where neither column resolves.
+        """
+        country_ids = np.full(len(df), -1, dtype=np.int64)
+        if code_col is not None:
+            country_ids = self.ids(df[code_col], kind)
+        if name_col is not None:
+            country_ids = np.where(country_ids >= 0, country_ids, self.ids(df[name_col], 'name'))
+        return df.assign(**{id_col: country_ids})
+
+    def name_keys(self) -> dict[str, str]:
+        """
+        Returns every known name key (case folded) mapped to its standardized country name.
+        """
+        names = self.countries['country_name'].to_numpy(dtype=object)
+        return {key: names[country_id] for key, country_id in self._keys['name'].items()}
+
+    def names(self, country_ids) -> np.ndarray:
+        """
+        Returns the standardized country name of each id, None for -1.
+        """
+        names = np.append(self.countries['country_name'].to_numpy(dtype=object), None)
+        return names[np.asarray(country_ids)]
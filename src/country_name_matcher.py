@@ -0,0 +1,175 @@
+# Import libraries
+import re
+import unicodedata
+
+import numpy as np  # linear algebra
+import pandas as pd  # data processing
+
+
+class CountryNameMatcher:
+    """
+    Proposes the closest canonical country name for the country names of a new dataset.
+
+    Names are normalized (accents and punctuation removed, case folded) and split into character
+    n-grams of each word, so the word order does not matter ('Korea, Rep.' and 'Republic of Korea'
+    share most of their n-grams). An inverted index from n-gram to canonical names restricts the
+    comparison of a name to the canonical names sharing at least one n-gram with it, instead of
+    comparing every pair. The score is the Dice coefficient of the two n-gram sets (1.0 for equal
+    normalized names).
+
+    The result of match is a table meant to be reviewed: correct or accept the proposals, then
+    pass the table to to_name_map and add the mapping to KaggleOlympicGamesMedals.country_name_map
+    or the aliases of a CountryDimension.
+    """
+
+    # Number of characters per n-gram
+    ngram_size = 3
+
+    # Matches scoring below min_score are 'unmatched'
+    min_score = 0.5
+
+    # Matches scoring at least accept_score and ahead of the runner-up by review_margin are 'accepted',
+    # the other matches are left for 'review'
+    accept_score = 0.8
+    review_margin = 0.1
+
+    # Words ignored when comparing names
+    stop_words: set[str] = {'the', 'of', 'and'}
+
+    def __init__(self, names, aliases: dict | None = None):
+        """
+        Builds the n-gram index over the canonical names.
+
+        Parameters:
+            names (array-like): The canonical country names, for example the standardized Olympic names.
+            aliases (dict, optional): Other spellings mapped to a canonical name, matched like the
+                canonical names. Aliases of unknown names are ignored. Defaults to None.
+        """
+        self.names = pd.Index(pd.unique(pd.Series(names).dropna().astype(str)))
+        lookup = {name: i for i, name in enumerate(self.names)}
+
+        # Index entries: the canonical names and their aliases, each pointing to a canonical name
+        entries = list(self.names)
+        targets = list(range(len(self.names)))
+        for alias, name in (aliases or {}).items():
+            if name in lookup:
+                entries.append(str(alias))
+                targets.append(lookup[name])
+        self._targets = np.array(targets, dtype=np.int64)
+        self._exact = {}
+        for entry, target in zip(entries, targets):
+            self._exact.setdefault(self._normalize(entry), target)
+
+        # Inverted index grouping the entry positions by n-gram
+        self._grams: dict[str, int] = {}
+        entry_grams = [np.array([self._grams.setdefault(gram, len(self._grams)) for gram in self._ngrams(entry)],
+                                dtype=np.int64) for entry in entries]
+        self._sizes = np.array([len(grams) for grams in entry_grams], dtype=np.int64)
+        gram_codes = np.concatenate(entry_grams + [np.empty(0, dtype=np.int64)])
+        entry_codes = np.repeat(np.arange(len(entries)), self._sizes)
+        order = np.argsort(gram_codes, kind='stable')
+        self._postings = entry_codes[order]
+        self._offsets = np.concatenate([[0], np.cumsum(np.bincount(gram_codes, minlength=len(self._grams)))])
+
+    def _normalize(self, name: str) -> str:
+        """
+        Returns the name without accents, punctuation, stop words and case.
+        """
+        name = unicodedata.normalize('NFKD', str(name))
+        name = ''.join(c for c in name if not unicodedata.combining(c)).casefold()
+        words = re.sub(r'[^0-9a-z]+', ' ', name).split()
+        return ' '.join(word for word in words if word not in self.stop_words)
+
+    def _ngrams(self, name: str) -> set[str]:
+        """
+        Returns the distinct n-grams of the words of the normalized name, each word padded with spaces.
+        """
+        grams = set()
+        for word in self._normalize(name).split():
+            word = f' {word} '
+            grams.update(word[i:i + self.ngram_size] for i in range(max(1, len(word) - self.ngram_size + 1)))
+        return grams
+
+    def _best_two(self, name: str) -> tuple:
+        """
+        Returns the positions and scores of the two best canonical names (-1 and 0.0 when missing)
+        and whether the name is an exact match.
+        """
+        grams = self._ngrams(name)
+        gram_ids = [self._grams[gram] for gram in grams if gram in self._grams]
+        targets = np.empty(0, dtype=np.int64)
+        scores = np.empty(0)
+        if gram_ids:
+            # Only the entries sharing an n-gram with the name are scored, with their shared n-gram counts
+            postings = np.concatenate([self._postings[self._offsets[g]:self._offsets[g + 1]] for g in gram_ids])
+            entries, shared = np.unique(postings, return_counts=True)
+            entry_scores = 2 * shared / (len(grams) + self._sizes[entries])
+            # Best entry per canonical name: the first of each name in descending score order
+            order = np.argsort(-entry_scores, kind='stable')
+            targets, first = np.unique(self._targets[entries][order], return_index=True)
+            scores = entry_scores[order][first]
+        exact = self._exact.get(self._normalize(name))
+        if exact is not None:
+            is_exact = targets == exact
+            targets = np.append(targets[~is_exact], exact)
+            scores = np.append(scores[~is_exact], 1.0)
+
+        if len(targets) > 2:
+            # Keep the candidates scoring at least the second best, then break ties by name position
+            threshold = np.partition(scores, len(scores) - 2)[len(scores) - 2]
+            top = np.flatnonzero(scores >= threshold)
+            targets, scores = targets[top], scores[top]
+        order = np.lexsort((targets, -scores))[:2]
+        best = [(int(targets[i]), float(scores[i])) for i in order]
+        (first, first_score), (second, second_score) = best + [(-1, 0.0)] * (2 - len(best))
+        return first, first_score, second, second_score, exact is not None
+
+    def match(self, values) -> pd.DataFrame:
+        """
+        Proposes a canonical name for every distinct value.
+
+        Parameters:
+            values (array-like): The country names of the new dataset, for example df['Country Name'].
+
+        Returns:
+            pd.DataFrame: One row per distinct non-missing value, sorted by source_name, with
+            'source_name', 'match_name' (None if unmatched), 'score', 'runner_up', 'runner_up_score'
+            and 'status' ('exact', 'accepted', 'review' or 'unmatched').
+        """
+        rows = []
+        for value in sorted(pd.unique(pd.Series(values).dropna().astype(str))):
+            best, score, second, second_score, is_exact = self._best_two(value)
+            if is_exact:
+                status = 'exact'
+            elif score >= self.accept_score and score - second_score >= self.review_margin:
+                status = 'accepted'
+            elif score >= self.min_score:
+                status = 'review'
+            else:
+                status = 'unmatched'
+            rows.append({
+                'source_name': value,
+                'match_name': self.names[best] if best >= 0 and status != 'unmatched' else None,
+                'score': round(score, 4),
+                'runner_up': self.names[second] if second >= 0 else None,
+                'runner_up_score': round(second_score, 4),
+                'status': status
+            })
+        return pd.DataFrame(
+            rows, columns=['source_name', 'match_name', 'score', 'runner_up', 'runner_up_score', 'status'])
+
+    @staticmethod
+    def to_name_map(df_matches: pd.DataFrame, statuses: tuple = ('exact', 'accepted')) -> dict:
+        """
+        Returns the reviewed matches as a mapping from source name to canonical name.
+
+        Parameters:
+            df_matches (pd.DataFrame): The (reviewed) result of match.
+            statuses (tuple, optional): The statuses to keep. Defaults to ('exact', 'accepted').
+
+        Returns:
+            dict: The source names that differ from their match, mapped to the match.
+        """
+        df = df_matches[df_matches['status'].isin(statuses) & df_matches['match_name'].notna()]
+        df = df[df['source_name'] != df['match_name']]
+        return dict(zip(df['source_name'], df['match_name']))
@@ -0,0 +1,161 @@
+# Import libraries
+import numpy as np  # linear algebra
+import pandas as pd  # data processing
+
+from country_dimension import CountryDimension
+
+
+class CountryYearSeries:
+    """
+    Yearly values per country (GDP, happiness scores, ...) keyed by CountryDimension ids, with an
+    as-of lookup returning for each (country, year) the value of that year or of the nearest
+    earlier year with a value.
+
+    For every value column the (country_id, year) pairs with a value are encoded as one sorted
+    integer key, so a lookup of any number of rows is a single np.searchsorted per column instead of
+    per-row filtering or merge loops.
+    """
+
+    # Years are encoded as country_id * year_base + year
+    year_base = 10_000
+
+    def __init__(self, df: pd.DataFrame, value_cols: list[str] | None = None):
+        """
+        Builds the series from a long DataFrame.
+
+        Parameters:
+            df (pd.DataFrame): One row per country and year with 'country_id' (-1 rows are ignored),
+                'year' and the value columns. Values of rows with the same country and year are averaged.
+            value_cols (list[str], optional): The value columns. Defaults to all other numeric columns.
+        """
+        self.value_cols = value_cols or [
+            col for col in df.select_dtypes('number').columns if col not in ('country_id', 'year')]
+        df = df.loc[df['country_id'] >= 0, ['country_id', 'year'] + self.value_cols]
+        df = df.groupby(['country_id', 'year'], as_index=False, sort=True)[self.value_cols].mean()
+
+        # Sorted keys and values of the available (country, year) pairs per value column
+        self._keys: dict[str, np.ndarray] = {}
+        self._values: dict[str, np.ndarray] = {}
+        keys = df['country_id'].to_numpy(dtype=np.int64) * self.year_base + df['year'].to_numpy(dtype=np.int64)
+        for col in self.value_cols:
+            values = df[col].to_numpy(dtype=np.float64)
+            has_value = ~np.isnan(values)
+            self._keys[col] = keys[has_value]
+            self._values[col] = values[has_value]
+        self.df = df
+
+    @classmethod
+    def from_wide(
+            cls,
+            df: pd.DataFrame,
+            countries: CountryDimension,
+            value_name: str,
+            name_col: str = 'Country Name',
+            code_col: str | None = 'Country Code') -> 'CountryYearSeries':
+        """
+        Builds the series from a wide World Bank table with one row per country and one column per year.
+
+        Parameters:
+            df (pd.DataFrame): The wide table, for example GDP_1960_2023.csv. Columns whose name is not
+                a year are ignored.
+            countries (CountryDimension): The dimension resolving the country names and codes.
+            value_name (str): The name of the value column, for example 'gdp'.
+            name_col (str, optional): The country name column. Defaults to 'Country Name'.
+            code_col (str, optional): The country code column, resolved as ISO codes if known to the
+                dimension. Defaults to 'Country Code'.
+
+        Returns:
+            CountryYearSeries: The series.
+        """
+        year_cols = [col for col in df.columns if str(col).strip().isdigit()]
+        country_ids = countries.add_ids(df, name_col=name_col, code_col=code_col)['country_id'].to_numpy()
+
+        # Reshape the year columns to long form in one step: row i, year j -> position i * n_years + j
+        values = df[year_cols].to_numpy(dtype=np.float64)
+        df_long = pd.DataFrame({
+            'country_id': np.repeat(country_ids, len(year_cols)),
+            'year': np.tile(np.array([int(col) for col in year_cols]), len(df)),
+            value_name: values.ravel()
+        })
+        return cls(df_long[df_long[value_name].notna()], [value_name])
+
+    @classmethod
+    def from_long(
+            cls,
+            df: pd.DataFrame,
+            countries: CountryDimension,
+            name_col: str = 'Country name',
+            year_col: str = 'year',
+            value_cols: list[str] | None = None,
+            code_col: str | None = None) -> 'CountryYearSeries':
+        """
+        Builds the series from a long table with one row per country and year, for example
+        world_happiness.csv.
+
+        Parameters:
+            df (pd.DataFrame): The long table.
+            countries (CountryDimension): The dimension resolving the country names and codes.
+            name_col (str, optional): The country name column. Defaults to 'Country name'.
+            year_col (str, optional): The year column. Defaults to 'year'.
+            value_cols (list[str], optional): The value columns. Defaults to the other numeric columns.
+            code_col (str, optional): A country code column, resolved as ISO codes. Defaults to None.
+
+        Returns:
+            CountryYearSeries: The series.
+        """
+        value_cols = value_cols or [
+            col for col in df.select_dtypes('number').columns if col not in (year_col, name_col, code_col)]
+        df_long = countries.add_ids(df[[col for col in (name_col, code_col) if col] + [year_col] + value_cols],
+                                    name_col=name_col, code_col=code_col)
+        return cls(df_long.rename(columns={year_col: 'year'}), value_cols)
+
+    def as_of(self, country_ids, years, max_lag: int | None = None) -> pd.DataFrame:
+        """
+        Looks up the value of every (country, year) pair, falling back to the nearest earlier year
+        with a value.
+
+        Parameters:
+            country_ids (array-like): The country ids, -1 for unknown countries.
+            years (array-like): The years, missing years get no value.
+            max_lag (int, optional): The maximum number of years to fall back. Defaults to None (no limit).
+
+        Returns:
+            pd.DataFrame: One row per pair with each value column and a '<value>_year' column holding
+            the year the value is from, missing when there is no value.
+        """
+        # Rows without a year are looked up as an unknown country
+        years = pd.Series(years).to_numpy(dtype=np.float64)
+        country_ids = np.where(np.isnan(years), -1, np.asarray(country_ids, dtype=np.int64))
+        years = np.nan_to_num(years).astype(np.int64)
+        query = country_ids * self.year_base + years
+        result = {}
+        for col in self.value_cols:
+            keys = self._keys[col]
+            # The last available key at or before the query key
+            pos = np.searchsorted(keys, query, side='right') - 1
+            found = keys[np.maximum(pos, 0)] if len(keys) else np.full(len(query), -1)
+            is_found = (pos >= 0) & (country_ids >= 0) & (found // self.year_base == country_ids)
+            found_years = found % self.year_base
+            if max_lag is not None:
+                is_found &= years - found_years <= max_lag
+            values = self._values[col][np.maximum(pos, 0)] if len(keys) else np.zeros(len(query))
+            result[col] = np.where(is_found, values, np.nan)
+            result[f'{col}_year'] = pd.arrays.IntegerArray(found_years, ~is_found)
+        return pd.DataFrame(result)
+
+    def join(self, df: pd.DataFrame, country_ids, years, max_lag: int | None = None) -> pd.DataFrame:
+        """
+        Returns the DataFrame with the as-of values of its rows added as columns.
+
+        Parameters:
+            df (pd.DataFrame): The DataFrame, for example medal rows or a country and game aggregate.
+            country_ids (array-like): The country id of each row.
+            years (array-like): The year of each row.
+            max_lag (int, optional): The maximum number of years to fall back. Defaults to None (no limit).
+
+        Returns:
+            pd.DataFrame: A copy of df with the value and '<value>_year' columns.
+        """
+        df_values = self.as_of(country_ids, years, max_lag)
+        df_values.index = df.index
+        return pd.concat([df, df_values], axis=1)
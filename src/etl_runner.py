@@ -0,0 +1,359 @@
+# Import libraries
+import argparse
+import hashlib  # input and code fingerprints
+import inspect
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np  # linear algebra
+import pandas as pd  # data processing, CSV file I/O (e.g. pd.read_csv)
+
+import country_dimension
+import kaggle_olympic_games_medals
+import medal_cube
+import medal_index
+import result_cache
+from country_dimension import CountryDimension
+from kaggle_olympic_games_medals import KaggleOlympicGamesMedals
+
+# Repository root, all stage paths are relative to it
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+KAGGLE_DIR = 'data/kaggle/olympic-games-medals'
+ETL_DIR = 'data/etl'
+
+# World Happiness columns renamed for the ETL outputs
+HAPPINESS_COLS = {
+    'Country name': 'country_name',
+    'Life Ladder': 'happiness',
+    'Log GDP per capita': 'wealth',
+    'Social support': 'support',
+    'Healthy life expectancy at birth': 'health',
+    'Freedom to make life choices': 'freedom',
+    'Generosity': 'generosity',
+    'Perceptions of corruption': 'corruption',
+    'Positive affect': 'positivity',
+    'Negative affect': 'negativity'
+}
+
+# World Bank country names replaced by the Olympic names
+WORLD_BANK_COUNTRY_NAMES = {
+    'Russian Federation': 'Russia',
+    'United Kingdom': 'Great Britain'
+}
+
+
+def copy_csv(root_dir: str, inputs: list[str], outputs: list[str]):
+    """
+    Copies a CSV file through pandas, as the notebooks did for the reference tables.
+    """
+    pd.read_csv(f'{root_dir}/{inputs[0]}').to_csv(f'{root_dir}/{outputs[0]}', index=False)
+
+
+def build_happiness_avg_by_country(root_dir: str, inputs: list[str], outputs: list[str]):
+    """
+    Averages the yearly World Happiness scores of each country.
+    """
+    df_happiness = pd.read_csv(f'{root_dir}/{inputs[0]}').rename(columns=HAPPINESS_COLS)
+    df_happiness = df_happiness.drop(columns=['year']).groupby('country_name').mean().reset_index()
+    df_happiness.loc[df_happiness['country_name'] == 'United Kingdom', 'country_name'] = 'Great Britain'
+    df_happiness.to_csv(f'{root_dir}/{outputs[0]}', index=False)
+
+
+def build_nutrition_by_country(root_dir: str, inputs: list[str], outputs: list[str]):
+    """
+    Prepares the cleaned 2017 World Bank food nutrition data per country.
+    """
+    df_nutrition = pd.read_csv(f'{root_dir}/{inputs[0]}', encoding='ISO-8859-1')
+    df_nutrition['country_name'] = df_nutrition['country_name'].replace(WORLD_BANK_COUNTRY_NAMES)
+    df_nutrition['population'] = df_nutrition['population'] / 1000
+    df_nutrition['good_diet_pct'] = (100 - df_nutrition['diet_pct']).where(df_nutrition['diet_pct'] > 0, np.nan)
+    df_nutrition.rename(columns={'diet_pct': 'bad_diet_pct'}, inplace=True)
+    df_nutrition = df_nutrition[[
+        'country_code', 'country_name', 'calories_pct', 'nutrients_pct', 'good_diet_pct', 'bad_diet_pct',
+        'calories_mills', 'nutrients_mills', 'diet_mills', 'population']]
+    df_nutrition.to_csv(f'{root_dir}/{outputs[0]}', index=False)
+
+
+def build_gdp_avg_by_country(root_dir: str, inputs: list[str], outputs: list[str]):
+    """
+    Keeps the average GDP of each country from the cleaned World Bank GDP data.
+    """
+    df_gdp = pd.read_csv(f'{root_dir}/{inputs[0]}')[['Country Name', 'Average']]
+    df_gdp = df_gdp.rename(columns={'Country Name': 'country_name', 'Average': 'gdp_avg'})
+    df_gdp['country_name'] = df_gdp['country_name'].replace(WORLD_BANK_COUNTRY_NAMES)
+    df_gdp.to_csv(f'{root_dir}/{outputs[0]}', index=False)
+
+
+def build_medal_aggregates(root_dir: str, inputs: list[str], outputs: list[str]):
+    """
+    Writes the medals_by_* aggregates of KaggleOlympicGamesMedals.
+    """
+    ogm = KaggleOlympicGamesMedals(f'{root_dir}/{os.path.dirname(inputs[0])}')
+    names = [os.path.splitext(os.path.basename(output))[0] for output in outputs]
+    ogm.write_medal_aggregates(f'{root_dir}/{os.path.dirname(outputs[0])}', names)
+
+
+def build_merged_medal_hap_nut_gdp(root_dir: str, inputs: list[str], outputs: list[str]):
+    """
+    Merges the medal counts per country with the happiness, nutrition and GDP data on the integer
+    country id of a CountryDimension, so differently spelled country names still match.
+    Inputs: medals, happiness, nutrition and GDP by country and the ISO 3166 country codes, in that order.
+    """
+    # Round-trip parsing keeps the floats identical to those written by the earlier stages
+    df_medals, df_happiness, df_nutrition, df_gdp, df_iso = [
+        pd.read_csv(f'{root_dir}/{path}', float_precision='round_trip') for path in inputs]
+
+    countries = CountryDimension(df_medals, code_col='country_code')
+    countries.add_codes(df_iso['English short name lower case'], df_iso['Alpha-3 code'])
+
+    # Map each dataset to country ids once, the unresolved rows (regions, income groups) are dropped
+    df_merged = countries.add_ids(df_medals, code_col='country_code', kind='ioc').drop(columns=['country_code'])
+    for df, code_col in [(df_happiness, None), (df_nutrition, 'country_code'), (df_gdp, None)]:
+        df = countries.add_ids(df, name_col='country_name', code_col=code_col)
+        df = df[df['country_id'] >= 0].drop(columns=['country_name', 'country_code'], errors='ignore')
+        df_merged = df_merged.merge(df, how='left', on='country_id', validate='many_to_one')
+    df_merged.drop(columns=['country_id']).to_csv(f'{root_dir}/{outputs[0]}', index=False)
+
+
+class EtlStage:
+    """
+    One step of the ETL: a function that reads its input files and writes its output files.
+
+    The function is called as func(root_dir, inputs, outputs) and must be defined at module level
+    so it can run in a worker process.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            func,
+            inputs: list[str],
+            outputs: list[str],
+            code_files: list[str] | None = None,
+            version: str = '1'):
+        """
+        Parameters:
+            name (str): The stage name.
+            func (Callable): The function producing the outputs.
+            inputs (list[str]): Input file paths relative to the root directory.
+            outputs (list[str]): Output file paths relative to the root directory.
+            code_files (list[str], optional): Source files whose changes should rerun the stage,
+                in addition to the source of func. Defaults to None.
+            version (str, optional): Bump to force the stage to rerun. Defaults to '1'.
+        """
+        self.name = name
+        self.func = func
+        self.inputs = inputs
+        self.outputs = outputs
+        self.code_files = code_files or []
+        self.version = version
+
+    def code_version(self) -> str:
+        """
+        Returns a hash of the stage version, the source of its function and its code files.
+        """
+        sha256 = hashlib.sha256(self.version.encode())
+        sha256.update(inspect.getsource(self.func).encode())
+        for code_file in self.code_files:
+            with open(code_file, 'rb') as f:
+                sha256.update(f.read())
+        return sha256.hexdigest()
+
+
+def _run_stage(stage: EtlStage, root_dir: str) -> float:
+    """
+    Runs one stage and returns its duration in seconds.
+    """
+    start = time.perf_counter()
+    for output in stage.outputs:
+        os.makedirs(os.path.dirname(f'{root_dir}/{output}'), exist_ok=True)
+    stage.func(root_dir, stage.inputs, stage.outputs)
+    return time.perf_counter() - start
+
+
+def default_stages() -> list[EtlStage]:
+    """
+    Returns the stages producing the files in data/etl.
+    """
+    medal_names = list(KaggleOlympicGamesMedals.medal_aggregates)
+    return [
+        EtlStage('happiness_reference', copy_csv,
+                 ['data/world-happiness/world_happiness_reference.csv'],
+                 [f'{ETL_DIR}/happiness_reference.csv']),
+        EtlStage('happiness_avg_by_country', build_happiness_avg_by_country,
+                 ['data/world-happiness/world_happiness.csv'],
+                 [f'{ETL_DIR}/happiness_avg_by_country.csv']),
+        EtlStage('nutrition_2017_reference', copy_csv,
+                 ['data/World_Bank/food_nutrition_2017_clean_ref.csv'],
+                 [f'{ETL_DIR}/nutrition_2017_reference.csv']),
+        EtlStage('nutrition_2017_by_country', build_nutrition_by_country,
+                 ['data/World_Bank/food_nutrition_2017_clean.csv'],
+                 [f'{ETL_DIR}/nutrition_2017_by_country.csv']),
+        EtlStage('gdp_avg_by_country', build_gdp_avg_by_country,
+                 ['data/World_Bank/World_Bank_GDP_Cleaned.csv'],
+                 [f'{ETL_DIR}/gdp_avg_by_country.csv']),
+        EtlStage('medal_aggregates', build_medal_aggregates,
+                 [f'{KAGGLE_DIR}/{KaggleOlympicGamesMedals.hosts_file_name}',
+                  f'{KAGGLE_DIR}/{KaggleOlympicGamesMedals.medals_file_name}'],
+                 [f'{ETL_DIR}/{name}.csv' for name in medal_names],
+                 code_files=[kaggle_olympic_games_medals.__file__, country_dimension.__file__,
+                             medal_cube.__file__, medal_index.__file__, result_cache.__file__]),
+        EtlStage('merged_medal_hap_nut_gdp_by_country', build_merged_medal_hap_nut_gdp,
+                 [f'{ETL_DIR}/medals_by_country.csv',
+                  f'{ETL_DIR}/happiness_avg_by_country.csv',
+                  f'{ETL_DIR}/nutrition_2017_by_country.csv',
+                  f'{ETL_DIR}/gdp_avg_by_country.csv',
+                  'data/kaggle/wikipedia-iso-country-codes.csv'],
+                 [f'{ETL_DIR}/merged_medal_hap_nut_gdp_by_country.csv'],
+                 code_files=[country_dimension.__file__])
+    ]
+
+
+class EtlRunner:
+    """
+    Runs ETL stages in dependency order, skipping stages whose inputs and code have not changed.
+
+    A stage depends on the stages producing its input files. Stages whose dependencies are done run
+    together in a process pool, so the independent happiness, nutrition, GDP and medal branches are
+    built in parallel. After a stage runs, the SHA-256 hashes of its inputs and its code version are
+    recorded in a state file, and the stage is skipped on later runs while they are unchanged and its
+    outputs exist.
+    """
+
+    state_file_name = f'{ETL_DIR}/.etl_state.json'
+
+    def __init__(
+            self,
+            stages: list[EtlStage] | None = None,
+            root_dir: str = ROOT_DIR,
+            processes: int | None = None):
+        """
+        Parameters:
+            stages (list[EtlStage], optional): The stages. Defaults to default_stages().
+            root_dir (str, optional): The directory the stage paths are relative to. Defaults to the repository root.
+            processes (int, optional): The number of worker processes, 1 runs the stages in the current process.
+                Defaults to None (the number of CPUs).
+        """
+        self.stages = {stage.name: stage for stage in (stages or default_stages())}
+        self.root_dir = root_dir
+        self.processes = processes or os.cpu_count() or 1
+        self.state_path = f'{root_dir}/{self.state_file_name}'
+
+        # A stage depends on the stages writing its inputs
+        producers = {output: stage.name for stage in self.stages.values() for output in stage.outputs}
+        self.dependencies = {
+            stage.name: {producers[path] for path in stage.inputs if path in producers}
+            for stage in self.stages.values()}
+
+    def _load_state(self) -> dict:
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                return json.load(f)
+        return {}
+
+    def _save_state(self, state: dict):
+        tmp_path = f'{self.state_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+
+    def _fingerprint(self, stage: EtlStage) -> dict:
+        """
+        Returns the SHA-256 hash of every input file and the code version of the stage.
+        """
+        inputs = {}
+        for path in stage.inputs:
+            sha256 = hashlib.sha256()
+            with open(f'{self.root_dir}/{path}', 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    sha256.update(block)
+            inputs[path] = sha256.hexdigest()
+        return {'inputs': inputs, 'code': stage.code_version()}
+
+    def _is_current(self, stage: EtlStage, state: dict) -> bool:
+        recorded = state.get(stage.name)
+        return recorded is not None \
+            and recorded.get('fingerprint') == self._fingerprint(stage) \
+            and all(os.path.exists(f'{self.root_dir}/{path}') for path in stage.outputs)
+
+    def _ordered_levels(self, names: set[str]) -> list[list[str]]:
+        """
+        Groups the given stages into levels, each level only depending on earlier levels.
+        """
+        levels = []
+        remaining = set(names)
+        while remaining:
+            level = sorted(name for name in remaining if not (self.dependencies[name] & remaining))
+            if not level:
+                raise ValueError(f'Circular stage dependencies between {sorted(remaining)}')
+            levels.append(level)
+            remaining -= set(level)
+        return levels
+
+    def run(self, names: list[str] | None = None, force: bool = False) -> pd.DataFrame:
+        """
+        Runs the given stages, and the stages they depend on, that are out of date.
+
+        Parameters:
+            names (list[str], optional): The stages to bring up to date. Defaults to all stages.
+            force (bool, optional): Whether to run the stages even if they are up to date. Defaults to False.
+
+        Returns:
+            pd.DataFrame: One row per stage in run order with 'stage', 'status' ('ran' or 'skipped')
+            and 'seconds'.
+
+        Raises:
+            ValueError: If a stage name is unknown.
+        """
+        unknown = set(names or []) - set(self.stages)
+        if unknown:
+            raise ValueError(f'Unknown stages {sorted(unknown)}, expected some of {list(self.stages)}')
+
+        # Include the dependencies of the requested stages
+        selected = set()
+        pending = list(names or self.stages)
+        while pending:
+            name = pending.pop()
+            if name not in selected:
+                selected.add(name)
+                pending.extend(self.dependencies[name])
+
+        state = self._load_state()
+        report = []
+        rerun = set()
+        executor = ProcessPoolExecutor(self.processes) if self.processes > 1 else None
+        try:
+            for level in self._ordered_levels(selected):
+                # A stage reruns when it changed or a stage it depends on reran
+                to_run = [name for name in level
+                          if force or self.dependencies[name] & rerun
+                          or not self._is_current(self.stages[name], state)]
+                if executor is not None and len(to_run) > 1:
+                    durations = list(executor.map(
+                        _run_stage, [self.stages[name] for name in to_run], [self.root_dir] * len(to_run)))
+                else:
+                    durations = [_run_stage(self.stages[name], self.root_dir) for name in to_run]
+
+                for name, seconds in zip(to_run, durations):
+                    state[name] = {'fingerprint': self._fingerprint(self.stages[name])}
+                    report.append({'stage': name, 'status': 'ran', 'seconds': round(seconds, 4)})
+                report.extend({'stage': name, 'status': 'skipped', 'seconds': 0.0}
+                              for name in level if name not in to_run)
+                rerun.update(to_run)
+                self._save_state(state)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return pd.DataFrame(report, columns=['stage', 'status', 'seconds'])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the data/etl files.')
+    parser.add_argument('stages', nargs='*', help='stages to bring up to date (default: all)')
+    parser.add_argument('--force', action='store_true', help='run the stages even if they are up to date')
+    parser.add_argument('--processes', type=int, default=None, help='number of worker processes')
+    args = parser.parse_args()
+    print(EtlRunner(processes=args.processes).run(args.stages or None, force=args.force).to_string(index=False))
@@ -0,0 +1,194 @@
+# Import libraries
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd  # data processing
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from kaggle_olympic_games_medals import KaggleOlympicGamesMedals
+
+# State of the current rendering process, set up once by _init_worker
+_worker: dict = {}
+
+# Medal cube dimensions of the job values, a job is only rendered if the data has medals for its values
+_job_dimensions = {
+    'season': 'game_season',
+    'country': 'country_name',
+    'discipline': 'discipline_title',
+    'gender': 'event_gender'
+}
+
+
+def _init_worker(
+        df: pd.DataFrame,
+        data_dir: str,
+        compact: bool,
+        result_cache_dir: str | None,
+        result_cache_max_bytes: int,
+        figsize: tuple,
+        dpi: int):
+    """
+    Sets up a rendering process: an analysis object with the settings of the renderer's object,
+    the medal data and one reusable Agg figure.
+    """
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    _worker.update(
+        ogm=KaggleOlympicGamesMedals(
+            data_dir,
+            compact=compact,
+            result_cache_dir=result_cache_dir,
+            result_cache_max_bytes=result_cache_max_bytes),
+        df=df,
+        figure=figure,
+        figsize=figsize,
+        dpi=dpi)
+
+
+def _render_job(job: tuple, output_dir: str) -> dict:
+    """
+    Renders one heatmap job into the output directory with the figure of the current process.
+
+    Returns:
+        dict: The manifest entry of the job.
+    """
+    country, season, discipline, gender = (tuple(job) + (None,) * 4)[:4]
+    entry = {'country': country, 'season': season, 'discipline': discipline, 'gender': gender}
+    ogm: KaggleOlympicGamesMedals = _worker['ogm']
+    df = _worker['df']
+    if country is None:
+        entry['kind'] = 'discipline_games'
+    elif discipline is None:
+        entry['kind'] = 'country_medals'
+    else:
+        entry['kind'] = 'country_discipline_gender_medals'
+    start = time.perf_counter()
+    try:
+        filters = {dim: entry[name] for name, dim in _job_dimensions.items() if entry[name] is not None}
+        if ogm.get_medal_cube(df).sum([], **filters).iloc[0] == 0:
+            raise ValueError(f'No medals for {filters}')
+
+        if country is None:
+            df_heatmap = ogm.get_discipline_game_heatmap(df, season)
+            file_name = ogm._discipline_games_heatmap_file_name(season)
+
+            def draw(ax):
+                ogm._draw_discipline_games_heatmap(ax, df_heatmap, season)
+        elif discipline is None:
+            df_heatmap = ogm.get_country_medal_heatmap(df, country, season)
+            file_name = ogm._country_medal_heatmap_file_name(country, season)
+
+            def draw(ax):
+                ogm._draw_country_medal_heatmap(ax, df_heatmap, country, season)
+        else:
+            df_heatmap = ogm.get_country_discipline_gender_medal_heatmap(df, season, country, discipline, gender)
+            file_name = ogm._country_discipline_gender_medal_heatmap_file_name(season, country, discipline, gender)
+
+            def draw(ax):
+                ogm._draw_country_discipline_gender_medal_heatmap(
+                    ax, df_heatmap, season, country, discipline, gender)
+
+        # Reuse the figure of this process instead of creating one per job
+        figure: Figure = _worker['figure']
+        figure.clf()
+        figure.set_size_inches(_worker['figsize'])
+        draw(figure.add_subplot())
+        figure.tight_layout()
+        entry['file'] = os.path.join(output_dir, file_name)
+        figure.savefig(entry['file'], dpi=_worker['dpi'])
+        entry['rows'], entry['columns'] = df_heatmap.shape
+        entry['error'] = None
+    except Exception as e:
+        entry.update(file=None, rows=None, columns=None, error=f'{type(e).__name__}: {e}')
+    entry['seconds'] = round(time.perf_counter() - start, 4)
+    return entry
+
+
+class HeatmapBatchRenderer:
+    """
+    Renders many medal heatmaps to image files without displaying them.
+
+    Jobs are (country, season, discipline, gender) tuples, shorter tuples or None values select
+    the heatmap type:
+    - (None, season): disciplines contested per Games (plot_discipline_games_heatmap)
+    - (country, season): medals of a country in a season (plot_country_medal_heatmap)
+    - (country, season, discipline, gender): medals per event (plot_country_discipline_gender_medal_heatmap)
+
+    The jobs are spread over a process pool. Each process draws on one reused Agg figure, and the
+    images are written to the output directory with a manifest.json describing every job.
+    """
+
+    manifest_file_name = 'manifest.json'
+
+    def __init__(
+            self,
+            ogm: KaggleOlympicGamesMedals,
+            output_dir: str,
+            df: pd.DataFrame | None = None,
+            processes: int | None = None,
+            figsize: tuple = (16, 16),
+            dpi: int = 200):
+        """
+        Initializes the renderer.
+
+        Parameters:
+            ogm (KaggleOlympicGamesMedals): The analysis object providing the medal data.
+            output_dir (str): The directory the images and the manifest are written to.
+            df (pd.DataFrame, optional): The cleaned medal DataFrame to plot.
+                Defaults to None (ogm.get_medals_by_std_country_name()).
+            processes (int, optional): The number of rendering processes, 1 renders in the current process.
+                Defaults to None (the number of CPUs).
+            figsize (tuple, optional): The size of the figures. Defaults to (16, 16).
+            dpi (int, optional): The resolution of the images. Defaults to 200.
+        """
+        self.ogm = ogm
+        self.output_dir = output_dir
+        self.df = df if df is not None else ogm.get_medals_by_std_country_name()
+        self.processes = processes or os.cpu_count() or 1
+        self.figsize = figsize
+        self.dpi = dpi
+
+    def render(self, jobs: list[tuple]) -> pd.DataFrame:
+        """
+        Renders the given jobs and writes the manifest.
+
+        A job whose values have no medals in the data (for example a country without medals in the
+        season) or that fails is recorded in the manifest with its error instead of stopping the batch.
+
+        Parameters:
+            jobs (list[tuple]): The (country, season, discipline, gender) jobs.
+
+        Returns:
+            pd.DataFrame: The manifest with one row per job, in job order: kind, country, season,
+            discipline, gender, file, rows, columns, error and seconds.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        result_cache = self.ogm.result_cache
+        init_args = (
+            self.df,
+            self.ogm.data_dir,
+            self.ogm.compact,
+            result_cache.cache_dir if result_cache is not None else None,
+            result_cache.max_bytes if result_cache is not None else 0,
+            self.figsize,
+            self.dpi)
+        output_dirs = [self.output_dir] * len(jobs)
+
+        if self.processes == 1 or len(jobs) <= 1:
+            _init_worker(*init_args)
+            try:
+                entries = list(map(_render_job, jobs, output_dirs))
+            finally:
+                _worker.clear()
+        else:
+            chunksize = max(1, len(jobs) // (self.processes * 4))
+            with ProcessPoolExecutor(self.processes, initializer=_init_worker, initargs=init_args) as executor:
+                entries = list(executor.map(_render_job, jobs, output_dirs, chunksize=chunksize))
+
+        with open(os.path.join(self.output_dir, self.manifest_file_name), 'w') as f:
+            json.dump(entries, f, indent=2, default=str)
+        columns = ['kind', 'country', 'season', 'discipline', 'gender', 'file', 'rows', 'columns', 'error', 'seconds']
+        return pd.DataFrame(entries, columns=columns)
@@ -1,9 +1,22 @@
 # Import libraries
-# import numpy as np  # linear algebra
+import hashlib  # source file fingerprints for the cache
+import inspect
+import json
+import os
+import numpy as np  # linear algebra
 import pandas as pd  # data processing, CSV file I/O (e.g. pd.read_csv)
 import seaborn as sns  # data visualization
 from matplotlib import pyplot as plt
 
+from country_dimension import CountryDimension
+from country_name_matcher import CountryNameMatcher
+from country_year_series import CountryYearSeries
+from medal_correlations import MedalCorrelations
+from medal_cube import MedalCube
+from medal_index import MedalIndex
+from medal_store import MedalStore
+from result_cache import ResultCache
+
 
 class KaggleOlympicGamesMedals:
 
@@ -36,6 +49,14 @@ class KaggleOlympicGamesMedals:
         'URS': 'Russia'
     }
 
+    # Host game locations that are not an Olympic team name, by game slug
+    host_location_fix_map = {
+        'melbourne-1956': 'Australia',
+        'pyeongchang-2018': 'North Korea',
+        'seoul-1988': 'South Korea',
+        'moscow-1980': 'Soviet Union'
+    }
+
     # Replaces changed discipline names
     discipline_title_map = {
         "Gymnastics Artistic": "Artistic Gymnastics",
@@ -49,6 +70,33 @@ class KaggleOlympicGamesMedals:
         "Short Track Speed Skating": "Short Track"
     }
 
+    # Low cardinality string columns stored as categoricals in compact mode
+    compact_columns: list[str] = [
+        'discipline_title',
+        'slug_game',
+        'event_title',
+        'event_gender',
+        'medal_type',
+        'participant_type',
+        'participant_title',
+        'country_name',
+        'country_code',
+        'country_3_letter_code',
+        'game_slug',
+        'game_location',
+        'game_country_code',
+        'game_name',
+        'game_season'
+    ]
+
+    # Event titles that identify the discipline, mapped to their (discipline_title, event_title) fix
+    event_title_fix_map = {
+        'Baseball': ('Baseball', 'baseball men'),
+        'Softball': ('Softball', 'softball women'),
+        'rugby-7 men': ('Rugby Sevens', 'men'),
+        'rugby-7 women': ('Rugby Sevens', 'women')
+    }
+
     pre_proc_group_cols: list[str] = [
         'discipline_title',
         'event_title',
@@ -69,24 +117,148 @@ class KaggleOlympicGamesMedals:
         'athlete_full_name'
     ]
 
-    def __init__(self, data_dir: str):
+    # Dataset name to file name attribute
+    dataset_file_attrs = {
+        'hosts': 'hosts_file_name',
+        'medals': 'medals_file_name',
+        'results': 'results_file_name',
+        'athletes': 'athletes_file_name'
+    }
+
+    # Default number of rows per chunk when streaming a dataset
+    stream_chunksize = 100_000
+
+    # Default group columns of the streamed aggregates
+    stream_group_cols: list[str] = [
+        'country_name',
+        'game_name',
+        'discipline_title'
+    ]
+
+    # Derived frames cached per instance and the datasets or stages each one is built from
+    stage_dependencies = {
+        'medals_merged': ['hosts', 'medals'],
+        'medals_cleaned': ['medals_merged'],
+        'medals_by_country': ['medals_cleaned'],
+        'medals_by_std_country_name': ['medals_by_country'],
+        'country_name_codes': ['medals_by_country'],
+        'country_dimension': ['country_name_codes'],
+        'hosts_with_country_codes': ['hosts', 'country_dimension']
+    }
+
+    # Number of DataFrames passed to the analysis methods for which cubes and indexes are kept
+    max_cached_frames = 4
+
+    # Columns identifying one medal in get_medals_by_country
+    medal_unique_cols: list[str] = [
+        'discipline_title',
+        'slug_game',
+        'event_title',
+        'event_gender',
+        'medal_type',
+        'participant_type',
+        'country_3_letter_code'
+    ]
+
+    # Medal count aggregates of get_medals_by_std_country_name (the data/etl/medals_by_* files).
+    # 'by_medal_type' aggregates have one column per medal type instead of a medal_type column and
+    # 'fill_value' replaces the medal types a group has no medals of (missing otherwise).
+    medal_aggregates: dict[str, dict] = {
+        'medals_by_country': {
+            'group_cols': ['country_3_letter_code', 'country_name']
+        },
+        'medals_by_season_country_discip_event_type': {
+            'group_cols': ['game_season', 'country_3_letter_code', 'country_name', 'discipline_title',
+                           'event_title', 'event_gender', 'medal_type']
+        },
+        'medals_by_slug_season_country_discip_event_type': {
+            'group_cols': ['slug_game', 'game_season', 'country_name', 'discipline_title',
+                           'event_title', 'event_gender', 'medal_type']
+        },
+        'medals_by_game_season_country_discip_event_gender_type': {
+            'group_cols': ['game_name', 'game_season', 'country_name', 'discipline_title',
+                           'event_title', 'event_gender', 'medal_type']
+        },
+        'medals_by_type_game_country_season_discip_event_gender': {
+            'group_cols': ['game_name', 'country_name', 'game_season', 'discipline_title',
+                           'event_title', 'event_gender'],
+            'by_medal_type': True
+        },
+        'medals_by_type_country_season_discip_event_gender': {
+            'group_cols': ['country_name', 'game_season', 'discipline_title', 'event_title', 'event_gender'],
+            'by_medal_type': True,
+            'fill_value': 0.0
+        }
+    }
+
+    # Medal type columns of the by_medal_type aggregates
+    medal_type_cols = {
+        'GOLD': 'gold',
+        'SILVER': 'silver',
+        'BRONZE': 'bronze'
+    }
+
+    # Prefix of the stage names of the medal aggregates
+    aggregate_stage_prefix = 'aggregate:'
+
+    # Suffix of the columnar cache files and their metadata
+    cache_file_suffix = '.parquet'
+    cache_meta_suffix = '.parquet.json'
+
+    # Mapping tables the results depend on, part of the result cache keys
+    result_cache_map_attrs: list[str] = [
+        'country_name_map',
+        'country_code_to_std_name_map',
+        'host_location_fix_map',
+        'discipline_title_map',
+        'event_title_fix_map',
+        'medal_unique_cols'
+    ]
+
+    def __init__(
+            self,
+            data_dir: str,
+            preload: list[str] | None = None,
+            use_cache: bool = False,
+            cache_dir: str | None = None,
+            compact: bool = False,
+            result_cache_dir: str | None = None,
+            result_cache_max_bytes: int = 256 * 2**20):
         """
-        Initializes the object with data from the specified data directory.
+        Initializes the object for the data files in the specified data directory.
 
         Args:
             data_dir (str): The directory path where the data files are located.
+            preload (list[str], optional): Names of the datasets to read immediately, any of
+                'hosts', 'medals', 'results' and 'athletes'. Defaults to None (nothing is read up front).
+            use_cache (bool, optional): Whether to keep a Parquet copy of each CSV file and read that
+                instead of the CSV on later loads. Requires pyarrow. Defaults to False.
+            cache_dir (str, optional): The directory for the Parquet copies. Defaults to data_dir.
+            compact (bool, optional): Whether to store the compact_columns of every dataset as pandas
+                categoricals to reduce memory use. Defaults to False.
+            result_cache_dir (str, optional): The directory of a ResultCache shared by processes, keeping
+                the heatmaps and country codes across runs. Requires pyarrow. Defaults to None (no cache).
+            result_cache_max_bytes (int, optional): The maximum size of the result cache, the least
+                recently used results are evicted. Defaults to 256 MiB.
 
         Returns:
             None
 
-        This function reads the data from the specified data directory and assigns it to the corresponding dataframes.
-        The dataframes are:
+        The data is loaded lazily: each dataframe is read from the data directory the first time it is
+        used and then cached on the instance. The dataframes are:
         - df_hosts: Contains information about the Olympic hosts.
         - df_medals: Contains information about the Olympic medals.
         - df_results: Contains information about the Olympic results.
         - df_athletes: Contains information about the Olympic athletes.
 
-        After loading the data, the function prints the message "Data Loaded".
+        With use_cache enabled, the Parquet copy is rebuilt whenever the size, modification time and
+        SHA-256 hash of the source CSV no longer match the ones recorded when the copy was written.
+
+        With a result_cache_dir, results are keyed by the method, its arguments, the SHA-256 hash of
+        the data they are computed from (the source files, or the contents of an assigned or passed
+        DataFrame), the result_cache_map_attrs tables and the source code of the classes computing them.
+
+        If any datasets are preloaded, the function prints the message "Data Loaded" once they are read.
 
         Note: The data files are expected to be in CSV format and have the following names:
         - hosts_file_name: The name of the file containing Olympic hosts data.
@@ -95,11 +267,290 @@ class KaggleOlympicGamesMedals:
         - athletes_file_name: The name of the file containing Olympic athletes data.
         """
         self.data_dir = data_dir
-        self.df_hosts = pd.read_csv(f'{data_dir}/{self.hosts_file_name}')
-        self.df_medals = pd.read_csv(f'{data_dir}/{self.medals_file_name}')
-        self.df_results = pd.read_csv(f'{data_dir}/{self.results_file_name}')
-        self.df_athletes = pd.read_csv(f'{data_dir}/{self.athletes_file_name}')
-        print('Data Loaded')
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir or data_dir
+        self.compact = compact
+        self._datasets: dict[str, pd.DataFrame] = {}
+        self._stages: dict[str, pd.DataFrame] = {}
+        self._frame_caches: dict[int, tuple[pd.DataFrame, dict]] = {}
+        self.result_cache = ResultCache(result_cache_dir, result_cache_max_bytes) if result_cache_dir else None
+        self._source_fingerprints: dict[str, str] = {}
+        self._assigned_datasets: set[str] = set()
+        if preload:
+            self.load_data(preload)
+            print('Data Loaded')
+
+    def load_data(self, datasets: list[str] | None = None) -> None:
+        """
+        Reads the given datasets into memory if they have not been loaded yet.
+
+        Parameters:
+            datasets (list[str], optional): Names of the datasets to load. Defaults to all datasets.
+
+        Raises:
+            ValueError: If a dataset name is not one of 'hosts', 'medals', 'results' or 'athletes'.
+            FileNotFoundError: If the file for a requested dataset does not exist.
+        """
+        for name in datasets or self.dataset_file_attrs.keys():
+            self._get_dataset(name)
+
+    def _get_dataset(self, name: str) -> pd.DataFrame:
+        """
+        Returns the named dataset, reading its CSV file on first access.
+        Internal use only.
+
+        Parameters:
+            name (str): The dataset name, one of the keys of dataset_file_attrs.
+
+        Returns:
+            pd.DataFrame: The cached dataframe for the dataset.
+        """
+        if name not in self.dataset_file_attrs:
+            raise ValueError(
+                f"Unknown dataset '{name}', expected one of {list(self.dataset_file_attrs)}")
+        if name not in self._datasets:
+            file_name = getattr(self, self.dataset_file_attrs[name])
+            if self.result_cache is not None:
+                # Hash the file the data is read from, it may change later
+                self._get_source_fingerprint(name)
+            df = self._read_csv(file_name)
+            self._datasets[name] = self._to_compact(df) if self.compact else df
+        return self._datasets[name]
+
+    def _read_csv(self, file_name: str) -> pd.DataFrame:
+        """
+        Reads a CSV file from the data directory, going through the Parquet cache when it is enabled.
+        Internal use only.
+
+        Parameters:
+            file_name (str): The name of the CSV file in the data directory.
+
+        Returns:
+            pd.DataFrame: The contents of the CSV file.
+        """
+        csv_path = f'{self.data_dir}/{file_name}'
+        if not self.use_cache:
+            return pd.read_csv(csv_path)
+
+        cache_path = f'{self.cache_dir}/{file_name}{self.cache_file_suffix}'
+        meta_path = f'{self.cache_dir}/{file_name}{self.cache_meta_suffix}'
+        fingerprint = self._get_cache_fingerprint(csv_path, meta_path)
+        if fingerprint is None:
+            return pd.read_parquet(cache_path)
+
+        # Cache is missing or stale, so parse the CSV and rewrite the cache
+        df = pd.read_csv(csv_path)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_suffix = f'.{os.getpid()}.tmp'
+        df.to_parquet(cache_path + tmp_suffix, index=False)
+        os.replace(cache_path + tmp_suffix, cache_path)
+        self._write_cache_meta(meta_path, fingerprint)
+        return df
+
+    def _get_cache_fingerprint(self, csv_path: str, meta_path: str) -> dict | None:
+        """
+        Compares the source CSV file against the metadata stored with its cache file.
+        Internal use only.
+
+        Size and modification time are checked first. The file is only hashed when they differ,
+        so a touched but unchanged file keeps its cache.
+
+        Parameters:
+            csv_path (str): The path of the source CSV file.
+            meta_path (str): The path of the cache metadata file.
+
+        Returns:
+            dict | None: None if the cache is valid, otherwise the fingerprint of the current source file.
+        """
+        stat = os.stat(csv_path)
+        fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        cache_path = meta_path[:-len(self.cache_meta_suffix)] + self.cache_file_suffix
+        meta = None
+        if os.path.exists(meta_path) and os.path.exists(cache_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get('size') == fingerprint['size'] and meta.get('mtime_ns') == fingerprint['mtime_ns']:
+                return None
+
+        fingerprint['sha256'] = self._hash_file(csv_path)
+        if meta is not None and meta.get('sha256') == fingerprint['sha256']:
+            # Content unchanged, only refresh the recorded size and modification time
+            self._write_cache_meta(meta_path, fingerprint)
+            return None
+        return fingerprint
+
+    @staticmethod
+    def _hash_file(path: str) -> str:
+        """
+        Returns the SHA-256 hash of a file.
+        """
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha256.update(block)
+        return sha256.hexdigest()
+
+    def _write_cache_meta(self, meta_path: str, fingerprint: dict):
+        """
+        Atomically writes the cache metadata file.
+        Internal use only.
+        """
+        tmp_path = f'{meta_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(fingerprint, f)
+        os.replace(tmp_path, meta_path)
+
+    def _to_compact(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Converts the compact_columns present in the DataFrame to pandas categoricals.
+        Internal use only.
+
+        Parameters:
+            df (pd.DataFrame): The DataFrame to convert.
+
+        Returns:
+            pd.DataFrame: The DataFrame with categorical columns.
+        """
+        cols = [col for col in self.compact_columns
+                if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype)]
+        return df.astype({col: 'category' for col in cols}) if cols else df
+
+    def _add_categories(self, df: pd.DataFrame, col: str, values) -> None:
+        """
+        Adds the given values to the categories of a categorical column so they can be assigned to rows.
+        Categories are kept sorted so categorical columns sort the same way as strings.
+        Does nothing for non-categorical columns.
+        Internal use only.
+        """
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            new_values = [v for v in dict.fromkeys(values) if v not in df[col].cat.categories]
+            if new_values:
+                df[col] = df[col].cat.set_categories(sorted([*df[col].cat.categories, *new_values]))
+
+    def _replace_values(self, values: pd.Series, value_map: dict) -> pd.Series:
+        """
+        Replaces the values of a Series using the given mapping.
+        Categorical Series are replaced per category instead of per row and stay categorical with sorted
+        categories, categories that map to the same value are merged.
+        Internal use only.
+
+        Parameters:
+            values (pd.Series): The Series to replace values in.
+            value_map (dict): Mapping of old values to new values.
+
+        Returns:
+            pd.Series: The Series with the values replaced.
+        """
+        if not isinstance(values.dtype, pd.CategoricalDtype):
+            return values.replace(value_map)
+        category_codes, categories = pd.factorize(
+            pd.Index([value_map.get(c, c) for c in values.cat.categories], dtype=object), sort=True)
+        codes = values.cat.codes.to_numpy()
+        return pd.Series(
+            pd.Categorical.from_codes(np.where(codes >= 0, category_codes[codes], -1), categories=categories),
+            index=values.index, name=values.name)
+
+    def _get_stage(self, name: str, build) -> pd.DataFrame:
+        """
+        Returns the cached derived frame for the given stage, building it on first use.
+        Internal use only: the returned frame is shared and must not be modified, use _copy_frame
+        before handing it out.
+
+        Parameters:
+            name (str): The stage name, one of the keys of stage_dependencies.
+            build (Callable[[], pd.DataFrame]): Function that computes the frame.
+
+        Returns:
+            pd.DataFrame: The cached frame for the stage.
+        """
+        if name not in self._stages:
+            self._stages[name] = build()
+        return self._stages[name]
+
+    def _copy_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns a copy of a cached frame that can be modified without affecting the cache.
+        With copy-on-write enabled (always the case in pandas 3) this is a cheap shallow copy,
+        otherwise the data is copied.
+        Internal use only.
+        """
+        copy_on_write = int(pd.__version__.split('.')[0]) >= 3 or pd.options.mode.copy_on_write is True
+        return df.copy(deep=not copy_on_write)
+
+    def invalidate_cache(self, names: list[str] | None = None) -> None:
+        """
+        Drops cached derived frames so they are recomputed on next use.
+        Call this after changing a mapping table such as country_name_map or discipline_title_map.
+
+        Parameters:
+            names (list[str], optional): Dataset or stage names that changed. Every stage built from
+                them, directly or indirectly, is dropped. Defaults to None (drop all stages).
+        """
+        self._frame_caches.clear()
+        if names is None:
+            self._stages.clear()
+            return
+        changed = set(names)
+        for stage, sources in self.stage_dependencies.items():
+            # stage_dependencies is in dependency order, so one pass reaches every downstream stage
+            if stage in changed or changed.intersection(sources):
+                changed.add(stage)
+                self._stages.pop(stage, None)
+
+        # The medal aggregates are all built from the standardized country names stage
+        for stage in list(self._stages):
+            if stage.startswith(self.aggregate_stage_prefix) and \
+                    (stage in changed or 'medals_by_std_country_name' in changed):
+                self._stages.pop(stage)
+
+    def is_loaded(self, name: str) -> bool:
+        """
+        Returns True if the named dataset has already been read into memory.
+        """
+        return name in self._datasets
+
+    def _assign_dataset(self, name: str, df: pd.DataFrame):
+        """
+        Replaces the named dataset with an in-memory DataFrame, no longer backed by its file.
+        Internal use only.
+        """
+        self._datasets[name] = df
+        self._assigned_datasets.add(name)
+        self._source_fingerprints.pop(name, None)
+
+    @property
+    def df_hosts(self) -> pd.DataFrame:
+        return self._get_dataset('hosts')
+
+    @df_hosts.setter
+    def df_hosts(self, df: pd.DataFrame):
+        self._assign_dataset('hosts', df)
+        self.invalidate_cache(['hosts'])
+
+    @property
+    def df_medals(self) -> pd.DataFrame:
+        return self._get_dataset('medals')
+
+    @df_medals.setter
+    def df_medals(self, df: pd.DataFrame):
+        self._assign_dataset('medals', df)
+        self.invalidate_cache(['medals'])
+
+    @property
+    def df_results(self) -> pd.DataFrame:
+        return self._get_dataset('results')
+
+    @df_results.setter
+    def df_results(self, df: pd.DataFrame):
+        self._assign_dataset('results', df)
+
+    @property
+    def df_athletes(self) -> pd.DataFrame:
+        return self._get_dataset('athletes')
+
+    @df_athletes.setter
+    def df_athletes(self, df: pd.DataFrame):
+        self._assign_dataset('athletes', df)
 
     def explore_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -114,7 +565,8 @@ class KaggleOlympicGamesMedals:
         This function takes a DataFrame as input and performs the following actions:
         1. Prints the information about the DataFrame: the number of rows, columns, data types, and memory usage.
         2. Prints the number of missing values in each column of the DataFrame.
-        3. Returns the first few rows of the DataFrame.
+        3. Prints the memory used by each column as stored and in compact (categorical) form.
+        4. Returns the first few rows of the DataFrame.
 
         Note:
         - The function assumes that the input DataFrame is a pandas DataFrame.
@@ -124,8 +576,31 @@ class KaggleOlympicGamesMedals:
         print(df.info())
         print("\n-- Missing Info --")
         print(df.isnull().sum())
+        print("\n-- Memory Usage --")
+        print(self.get_memory_report(df))
         return df.head()
 
+    def get_memory_report(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Reports the memory used by each column of the DataFrame before and after compaction.
+
+        Parameters:
+            df (pd.DataFrame): The DataFrame to report on.
+
+        Returns:
+            pd.DataFrame: A DataFrame indexed by column name (plus a 'Total' row) with the dtype and
+            the deep memory usage in bytes as stored ('bytes') and with the compact_columns stored
+            as categoricals ('compact_bytes').
+        """
+        df_compact = self._to_compact(df)
+        df_report = pd.DataFrame({
+            'dtype': df.dtypes.astype(str),
+            'bytes': df.memory_usage(index=False, deep=True),
+            'compact_bytes': df_compact.memory_usage(index=False, deep=True)
+        })
+        df_report.loc['Total'] = ['', df_report['bytes'].sum(), df_report['compact_bytes'].sum()]
+        return df_report
+
     def get_hosts(self) -> pd.DataFrame:
         """
         Get the raw hosts DataFrame by returning a copy of the df_hosts attribute.
@@ -142,23 +617,20 @@ class KaggleOlympicGamesMedals:
         Returns:
             pd.DataFrame: a DataFrame with hosts and their corresponding country codes.
         """
+        return self._copy_frame(self._get_stage('hosts_with_country_codes', self._build_hosts_with_country_codes))
+
+    def _build_hosts_with_country_codes(self) -> pd.DataFrame:
         df = self.get_hosts()
-        df.loc[df['game_slug'] == 'melbourne-1956',
-               'game_location'] = 'Australia'
-        df.loc[df['game_slug'] == 'pyeongchang-2018',
-               'game_location'] = 'North Korea'
-        df.loc[df['game_slug'] == 'seoul-1988',
-               'game_location'] = 'South Korea'
-        df.loc[df['game_slug'] == 'moscow-1980',
-               'game_location'] = 'Soviet Union'
-
-        df_codes = self.get_country_name_codes()
-        df = df.merge(df_codes, how='left',
-                      left_on='game_location', right_on='country_name')
-        df.drop(['country_name'], inplace=True, axis=1)
-        df.rename(
-            columns={'country_3_letter_code': 'game_country_code'}, inplace=True)
-        return df
+        locations = df['game_slug'].map(self.host_location_fix_map)
+        is_fixed = locations.notna()
+        self._add_categories(df, 'game_location', self.host_location_fix_map.values())
+        df.loc[is_fixed, 'game_location'] = locations[is_fixed]
+
+        # Look up the IOC code of the host team, names and codes of the teams are one to one
+        df_teams = self.get_country_dimension().teams
+        team_codes = pd.Series(df_teams['country_3_letter_code'].to_numpy(), index=df_teams['team_name'])
+        df['game_country_code'] = df['game_location'].map(team_codes)
+        return self._to_compact(df) if self.compact else df
 
     def get_medals(self) -> pd.DataFrame:
         """
@@ -178,7 +650,14 @@ class KaggleOlympicGamesMedals:
         Returns:
             pd.DataFrame: A pandas DataFrame containing the merged and cleaned data.
         """
-        return self._clean_data(self._merge_hosts(self.get_medals()))
+        return self._copy_frame(self._get_medals_cleaned())
+
+    def _get_medals_cleaned(self) -> pd.DataFrame:
+        """
+        Returns the shared, cached cleaned medals frame. Internal use only, must not be modified.
+        """
+        df_merged = self._get_stage('medals_merged', lambda: self._merge_hosts(self.df_medals))
+        return self._get_stage('medals_cleaned', lambda: self._clean_data(df_merged.copy()))
 
     def get_medals_by_country(self) -> pd.DataFrame:
         """
@@ -188,17 +667,13 @@ class KaggleOlympicGamesMedals:
         Returns:
             pd.DataFrame: A pandas DataFrame with medals data by country.
         """
-        unique_cols: list[str] = [
-            'discipline_title',
-            'slug_game',
-            'event_title',
-            'event_gender',
-            'medal_type',
-            'participant_type',
-            'country_3_letter_code'
-        ]
-        return self._get_medals_merged()\
-            .drop_duplicates(subset=unique_cols)\
+        return self._copy_frame(self._get_stage('medals_by_country', self._build_medals_by_country))
+
+    def _build_medals_by_country(self) -> pd.DataFrame:
+        return self._medals_by_country(self._get_medals_cleaned())
+
+    def _medals_by_country(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.drop_duplicates(subset=self.medal_unique_cols)\
             .drop(columns=['participant_title', 'athlete_url', 'athlete_full_name', 'country_code'])
 
     def get_medals_by_std_country_name(self) -> pd.DataFrame:
@@ -208,9 +683,17 @@ class KaggleOlympicGamesMedals:
         Returns:
             pd.DataFrame: A pandas DataFrame with standardized country names in the medals data.
         """
-        df = self.get_medals_by_country()
-        for key, value in self.country_code_to_std_name_map.items():
-            df.loc[df['country_3_letter_code'] == key, 'country_name'] = value
+        return self._copy_frame(
+            self._get_stage('medals_by_std_country_name', self._build_medals_by_std_country_name))
+
+    def _build_medals_by_std_country_name(self) -> pd.DataFrame:
+        return self._std_country_names(self.get_medals_by_country())
+
+    def _std_country_names(self, df: pd.DataFrame) -> pd.DataFrame:
+        self._add_categories(df, 'country_name', self.country_code_to_std_name_map.values())
+        std_names = df['country_3_letter_code'].map(self.country_code_to_std_name_map)
+        is_std = std_names.notna()
+        df.loc[is_std, 'country_name'] = std_names[is_std]
         return df
 
     def get_athletes(self) -> pd.DataFrame:
@@ -249,6 +732,90 @@ class KaggleOlympicGamesMedals:
         """
         return self._clean_data(self._merge_hosts(self.get_results()))
 
+    def iter_merged_results(self, chunksize: int | None = None):
+        """
+        Streams the results file in chunks, merged with the host data and cleaned like get_merged_results.
+
+        Parameters:
+            chunksize (int, optional): The number of rows per chunk. Defaults to stream_chunksize.
+
+        Yields:
+            pd.DataFrame: The merged and cleaned chunks, in file order.
+        """
+        yield from self._iter_merged_dataset('results', chunksize)
+
+    def iter_merged_athletes(self, chunksize: int | None = None):
+        """
+        Streams the athletes file in chunks, merged with the host data and cleaned like get_merged_athletes.
+
+        Parameters:
+            chunksize (int, optional): The number of rows per chunk. Defaults to stream_chunksize.
+
+        Yields:
+            pd.DataFrame: The merged and cleaned chunks, in file order.
+        """
+        yield from self._iter_merged_dataset('athletes', chunksize)
+
+    def _iter_merged_dataset(self, name: str, chunksize: int | None = None):
+        """
+        Reads the named dataset file in chunks and merges and cleans each chunk.
+        Internal use only.
+
+        Only the hosts data and one chunk are held in memory at a time. The dataset is not cached
+        on the instance, and an already loaded dataset is not used.
+
+        Parameters:
+            name (str): The dataset name, 'results' or 'athletes'.
+            chunksize (int, optional): The number of rows per chunk. Defaults to stream_chunksize.
+
+        Yields:
+            pd.DataFrame: The merged and cleaned chunks.
+        """
+        if name not in self.dataset_file_attrs:
+            raise ValueError(
+                f"Unknown dataset '{name}', expected one of {list(self.dataset_file_attrs)}")
+        file_name = getattr(self, self.dataset_file_attrs[name])
+        with pd.read_csv(f'{self.data_dir}/{file_name}', chunksize=chunksize or self.stream_chunksize) as reader:
+            for chunk in reader:
+                if self.compact:
+                    chunk = self._to_compact(chunk)
+                yield self._clean_data(self._merge_hosts(chunk))
+
+    def aggregate_merged_results(
+            self,
+            group_cols: list[str] | None = None,
+            chunksize: int | None = None,
+            name: str = 'results') -> pd.DataFrame:
+        """
+        Streams a dataset in chunks and folds the merged and cleaned chunks into running counts,
+        so memory use depends on the chunk size and the number of groups, not on the file size.
+
+        Parameters:
+            group_cols (list[str], optional): The columns to count by. Defaults to stream_group_cols
+                (country, game and discipline).
+            chunksize (int, optional): The number of rows per chunk. Defaults to stream_chunksize.
+            name (str, optional): The dataset to stream, 'results' or 'athletes'. Defaults to 'results'.
+
+        Returns:
+            pd.DataFrame: One row per group, sorted by the group columns, with 'result_count' (rows) and,
+            when the dataset has a medal_type column, 'medal_count' (rows with a medal).
+        """
+        group_cols = group_cols or self.stream_group_cols
+        df_totals = None
+        for chunk in self._iter_merged_dataset(name, chunksize):
+            counts = {'result_count': np.ones(len(chunk), dtype=np.int64)}
+            if 'medal_type' in chunk.columns:
+                counts['medal_count'] = chunk['medal_type'].notna().to_numpy(dtype=np.int64)
+            df_counts = pd.DataFrame(counts, index=chunk.index)
+            # Group by plain values so the categories of separate chunks can be combined
+            keys = [chunk[col].astype(object) for col in group_cols]
+            df_chunk_totals = df_counts.groupby(keys, dropna=False).sum()
+            df_totals = df_chunk_totals if df_totals is None else df_totals.add(df_chunk_totals, fill_value=0)
+
+        if df_totals is None:
+            return pd.DataFrame(columns=group_cols + ['result_count'])
+        return df_totals.astype(np.int64).sort_index().reset_index()
+
     def _merge_hosts(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Merge the given dataframe with hosts dataframes based on the 'slug_game' column
@@ -283,12 +850,12 @@ class KaggleOlympicGamesMedals:
             df['athlete_full_name'] = df['athlete_full_name'].str.title()
 
         if 'country_name' in df.columns:
-            df['country_name'] = df['country_name'].replace(
-                self.country_name_map)
+            df['country_name'] = self._replace_values(
+                df['country_name'], self.country_name_map)
 
         if 'discipline_title' in df.columns:
-            df['discipline_title'] = df['discipline_title'].replace(
-                self.discipline_title_map)
+            df['discipline_title'] = self._replace_values(
+                df['discipline_title'], self.discipline_title_map)
             if 'event_title' in df.columns:
                 self._fix_discipline_events(df)
 
@@ -311,26 +878,70 @@ class KaggleOlympicGamesMedals:
         Returns:
             pd.DataFrame: The DataFrame with the fixed discipline and event titles.
         """
-        # fix some disciplines and events
-        df.loc[df['event_title'] == 'Baseball',
-               'discipline_title'] = 'Baseball'
-        df.loc[df['event_title'] == 'Softball',
-               'discipline_title'] = 'Softball'
-        df.loc[df['event_title'] == 'Baseball', 'event_title'] = 'baseball men'
-        df.loc[df['event_title'] == 'Softball',
-               'event_title'] = 'softball women'
-
-        df.loc[df['event_title'] == 'rugby-7 men',
-               'discipline_title'] = 'Rugby Sevens'
-        df.loc[df['event_title'] == 'rugby-7 women',
-               'discipline_title'] = 'Rugby Sevens'
-        df.loc[df['event_title'] == 'rugby-7 men', 'event_title'] = 'men'
-        df.loc[df['event_title'] == 'rugby-7 women', 'event_title'] = 'women'
-        df['event_title'] = df['event_title'].apply(
-            lambda et: self._clean_event_title(et))
+        # Encode the event titles once, then fix and clean each distinct title instead of each row
+        codes, unique_titles = pd.factorize(df['event_title'])
+        fixed_disciplines = {}
+        cleaned_titles = []
+        for code, et in enumerate(unique_titles):
+            if et in self.event_title_fix_map:
+                fixed_disciplines[code], et = self.event_title_fix_map[et]
+            cleaned_titles.append(self._clean_event_title(et))
+
+        # Apply the baseball/softball/rugby discipline fixes as a single lookup
+        if fixed_disciplines:
+            self._add_categories(df, 'discipline_title', fixed_disciplines.values())
+            is_fixed = np.isin(codes, list(fixed_disciplines))
+            df.loc[is_fixed, 'discipline_title'] = pd.Series(codes[is_fixed]).map(fixed_disciplines).to_numpy()
+
+        # Map the cleaned titles back to the rows, categorical titles stay categorical
+        if isinstance(df['event_title'].dtype, pd.CategoricalDtype):
+            title_codes, categories = pd.factorize(pd.Index(cleaned_titles, dtype=object), sort=True)
+            df['event_title'] = pd.Categorical.from_codes(
+                np.where(codes >= 0, title_codes[codes], -1), categories=categories)
+            return df
+
+        # Code -1 (missing title) picks the trailing NaN
+        lookup = np.empty(len(cleaned_titles) + 1, dtype=object)
+        lookup[:-1] = cleaned_titles
+        lookup[-1] = np.nan
+        df['event_title'] = pd.Series(lookup[codes], index=df.index)
         return df
 
-    def pre_process_medal_counts(self, df: pd.DataFrame):
+    def _factorize_groups(self, df: pd.DataFrame, cols: list[str]) -> np.ndarray:
+        """
+        Encodes the combination of the given columns of each row as one integer group id.
+        Internal use only.
+
+        Each column is factorized to sorted integer codes once and the codes are combined column by
+        column, re-encoding after each step so the ids stay dense. Group ids therefore follow the
+        sorted order of the key tuples, the same order as DataFrame.groupby(cols).
+
+        Parameters:
+            df (pd.DataFrame): The DataFrame to encode.
+            cols (list[str]): The columns that make up the group key.
+
+        Returns:
+            np.ndarray: The group id of each row, or -1 for rows with a missing key value
+            (dropped by groupby as well).
+        """
+        group_ids = np.zeros(len(df), dtype=np.int64)
+        is_valid = np.ones(len(df), dtype=bool)
+        for col in cols:
+            codes, uniques = pd.factorize(df[col], sort=True)
+            is_valid &= codes >= 0
+            group_ids = group_ids * len(uniques) + np.maximum(codes, 0)
+            group_ids = np.unique(group_ids, return_inverse=True)[1].astype(np.int64)
+
+        # Rows with a missing key leave gaps, so re-encode the remaining ids
+        valid_ids = np.unique(group_ids[is_valid], return_inverse=True)[1]
+        group_ids = np.full(len(df), -1, dtype=np.int64)
+        group_ids[is_valid] = valid_ids
+        return group_ids
+
+    def pre_process_medal_counts(
+            self,
+            df: pd.DataFrame,
+            members_table: bool = False) -> pd.DataFrame | tuple[pd.DataFrame, pd.DataFrame]:
         """
         The dataset contains two different rows for both winners in a team competition
         that consists of two persons, but it is one medal in total. For example, you
@@ -342,28 +953,268 @@ class KaggleOlympicGamesMedals:
         and country codes. The function takes in a pandas DataFrame as input and
         returns a pre-processed DataFrame.
 
+        The team rows are grouped by encoding pre_proc_group_cols to one integer group id per row
+        (see _factorize_groups), keeping the first row of each group and collecting the athlete
+        names of each group in a single pass.
+
         Parameters:
         - df (pd.DataFrame): The input DataFrame containing medal counts data.
+        - members_table (bool, optional): If True, the team athletes are returned as a separate
+          long table instead of lists in the athlete_full_name column. Defaults to False.
 
         Returns:
         - pd.DataFrame: The pre-processed DataFrame with separate athlete and game team
           data, aggregated athlete full names and country codes, and concatenated with
           the original athlete data.
+        - If members_table is True, a tuple of the pre-processed DataFrame (athlete_full_name is
+          missing for the grouped team rows) and a DataFrame with one row per team athlete and the
+          columns 'team_index' (index of the team row in the pre-processed DataFrame) and
+          'athlete_full_name'.
         """
         df_athlete = df[df['participant_type'] == 'Athlete']
         df_team = df[df['participant_type'] == 'GameTeam']
         df_team_a = df_team[df_team['athlete_full_name'].isna()]
-        df_team_b: pd.DataFrame = df_team[df_team['athlete_full_name'].notna()]\
-            .groupby(self.pre_proc_group_cols)[self.pre_proc_agg_cols].agg(lambda x: set(x))\
-            .reset_index()
+        df_team_members = df_team[df_team['athlete_full_name'].notna()]
+
+        # Keep the first row of each team, in group key order like groupby
+        group_ids = self._factorize_groups(df_team_members, self.pre_proc_group_cols)
+        is_grouped = group_ids >= 0
+        group_ids = group_ids[is_grouped]
+        df_team_members = df_team_members[is_grouped]
+        first_rows = np.unique(group_ids, return_index=True)[1]
+        df_team_b = df_team_members.iloc[first_rows][self.pre_proc_group_cols + ['country_code']]\
+            .reset_index(drop=True)
+
+        # One row per distinct athlete of each team, sorted by team
+        athlete_names = df_team_members['athlete_full_name'].to_numpy(dtype=object)
+        is_first = ~pd.DataFrame({
+            'group_id': group_ids,
+            'athlete': pd.factorize(athlete_names)[0]
+        }).duplicated().to_numpy()
+        member_order = np.argsort(group_ids[is_first], kind='stable')
+        member_group_ids = group_ids[is_first][member_order]
+        member_names = athlete_names[is_first][member_order]
+
+        if members_table:
+            df_team_b['athlete_full_name'] = np.nan
+            df_members = pd.DataFrame({
+                'team_index': member_group_ids + len(df_team_a),
+                'athlete_full_name': member_names
+            })
+            df_pre_proc = pd.concat([df_team_a, df_team_b, df_athlete], axis=0).reset_index(drop=True)
+            return df_pre_proc, df_members
+
+        # Split the sorted names at each change of team
+        team_starts = np.flatnonzero(np.diff(member_group_ids)) + 1
+        df_team_b['athlete_full_name'] = [list(names) for names in np.split(member_names, team_starts)] \
+            if len(member_names) > 0 else []
 
-        df_team_b['country_code'] = df_team_b['country_code'].apply(
-            lambda x: list(x)[0])
+        return pd.concat([df_team_a, df_team_b, df_athlete], axis=0).reset_index(drop=True)
 
-        df_team_b['athlete_full_name'] = df_team_b['athlete_full_name'].apply(
-            lambda x: list(x))
+    def _get_frame_cache(self, df: pd.DataFrame | None, name: str, build):
+        """
+        Returns the named structure (cube or index) built from the given DataFrame, building it on first use.
+        Internal use only.
 
-        return pd.concat([df_team_a, df_team_b, df_athlete], axis=0).reset_index(drop=True)
+        Structures are cached per DataFrame object for up to max_cached_frames DataFrames.
+
+        Parameters:
+            df (pd.DataFrame | None): The DataFrame, None for the output of get_medals_by_std_country_name.
+            name (str): The name of the structure.
+            build (Callable[[pd.DataFrame], object]): Function that builds the structure from the DataFrame.
+        """
+        if df is None:
+            df = self._get_stage('medals_by_std_country_name', self._build_medals_by_std_country_name)
+        cached = self._frame_caches.get(id(df))
+        if cached is None or cached[0] is not df:
+            if len(self._frame_caches) >= self.max_cached_frames:
+                self._frame_caches.pop(next(iter(self._frame_caches)))
+            # Keep a reference to the DataFrame so its id is not reused while cached
+            cached = (df, {})
+            self._frame_caches[id(df)] = cached
+        if name not in cached[1]:
+            cached[1][name] = build(df)
+        return cached[1][name]
+
+    def _get_source_fingerprint(self, name: str) -> str:
+        """
+        Returns the SHA-256 hash of the named dataset: of its file, or of its contents once it has been
+        assigned or appended to. Internal use only.
+        """
+        if name not in self._source_fingerprints:
+            if name in self._assigned_datasets:
+                fingerprint = self._frame_fingerprint(self._datasets[name])
+            else:
+                fingerprint = self._hash_file(f'{self.data_dir}/{getattr(self, self.dataset_file_attrs[name])}')
+            self._source_fingerprints[name] = fingerprint
+        return self._source_fingerprints[name]
+
+    @staticmethod
+    def _frame_fingerprint(df: pd.DataFrame, cols: list[str] | None = None) -> str:
+        """
+        Returns the SHA-256 hash of the names, types and values of the DataFrame columns (all columns
+        or the given ones present), ignoring the index. Internal use only.
+        """
+        if cols is not None:
+            df = df[[col for col in cols if col in df.columns]]
+        sha256 = hashlib.sha256(json.dumps([[str(col) for col in df.columns],
+                                            [str(dtype) for dtype in df.dtypes]]).encode())
+        sha256.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        return sha256.hexdigest()
+
+    def _get_code_fingerprint(self) -> str:
+        """
+        Returns the SHA-256 hash of the source files of the classes computing the cached results.
+        Internal use only.
+        """
+        if 'code' not in self._source_fingerprints:
+            sha256 = hashlib.sha256()
+            for cls in (type(self), MedalCube, MedalIndex, CountryDimension):
+                sha256.update(self._hash_file(inspect.getsourcefile(cls)).encode())
+            self._source_fingerprints['code'] = sha256.hexdigest()
+        return self._source_fingerprints['code']
+
+    def _cached_result(self, method: str, args: dict, build, df: pd.DataFrame | None = None) -> pd.DataFrame:
+        """
+        Returns the result of build() from the result cache, computing and storing it on a miss.
+        Without a result cache, simply returns build(). Internal use only.
+
+        Parameters:
+            method (str): The name of the method.
+            args (dict): The arguments of the method, other than df.
+            build (Callable[[], pd.DataFrame]): Function that computes the result.
+            df (pd.DataFrame, optional): The medal DataFrame passed to the method, its cube columns
+                are hashed once per DataFrame object. Defaults to None (the result is computed from
+                the hosts and medals datasets).
+        """
+        if self.result_cache is None:
+            return build()
+        if df is None:
+            data = [self._get_source_fingerprint(name) for name in ('hosts', 'medals')]
+        else:
+            data = self._get_frame_cache(
+                df, 'fingerprint', lambda df: self._frame_fingerprint(df, MedalCube.dimensions + ['participant_type']))
+        maps = {attr: getattr(self, attr) for attr in self.result_cache_map_attrs}
+        key = ResultCache.key(method, args, data, maps, self._get_code_fingerprint(), self.compact)
+        return self.result_cache.get_or_build(key, build)
+
+    def get_medal_cube(self, df: pd.DataFrame | None = None) -> MedalCube:
+        """
+        Returns the MedalCube of medal counts for the given DataFrame, building it on first use.
+
+        Cubes are cached per DataFrame object (up to max_cached_frames), so calling the heatmap getters
+        repeatedly with the same DataFrame only scans it once. Build a new DataFrame, or call
+        invalidate_cache, after modifying a DataFrame in place.
+
+        Parameters:
+            df (pd.DataFrame, optional): The cleaned medal DataFrame.
+                Defaults to None (the output of get_medals_by_std_country_name).
+
+        Returns:
+            MedalCube: The medal count cube for the DataFrame.
+        """
+        return self._get_frame_cache(df, 'cube', MedalCube)
+
+    def get_medal_index(self, df: pd.DataFrame | None = None) -> MedalIndex:
+        """
+        Returns the MedalIndex over the rows of the given DataFrame, building it on first use.
+        Indexes are cached per DataFrame object like the cubes of get_medal_cube.
+
+        Parameters:
+            df (pd.DataFrame, optional): The cleaned medal DataFrame.
+                Defaults to None (the output of get_medals_by_std_country_name).
+
+        Returns:
+            MedalIndex: The index over game_season, country_name, discipline_title, event_gender,
+            medal_type and game_year.
+        """
+        return self._get_frame_cache(df, 'index', MedalIndex)
+
+    def select_medals(self, df: pd.DataFrame | None = None, **filters) -> pd.DataFrame:
+        """
+        Returns the rows of the medal DataFrame matching all the filters, using its MedalIndex.
+
+        Example:
+        ogm.select_medals(df, game_season='Summer', country_name='Kenya', medal_type=['GOLD', 'SILVER'])
+
+        Parameters:
+            df (pd.DataFrame, optional): The cleaned medal DataFrame.
+                Defaults to None (the output of get_medals_by_std_country_name).
+            **filters: column=value pairs for the indexed columns, a list of values matches any of them.
+
+        Returns:
+            pd.DataFrame: A copy of the matching rows.
+        """
+        return self.get_medal_index(df).select(**filters).copy()
+
+    def get_medal_standings(
+            self,
+            df: pd.DataFrame | None = None,
+            windows: list[int] | None = None,
+            merge_countries: bool = False) -> pd.DataFrame:
+        """
+        Returns the medal table of every Games: the gold, silver, bronze and total medals and the
+        gold-first rank of every country with a medal, plus its cumulative medals since its first Games
+        of the season and, optionally, its medals over the last Games of the season.
+
+        All Games are computed in one pass over the medal cube instead of one table per country or Games.
+        Countries with the same golds, silvers and bronzes share the best rank, as in the official tables.
+
+        Parameters:
+            df (pd.DataFrame, optional): The cleaned medal DataFrame. Defaults to None (the output of
+                get_medals_by_country, one row per team as it competed, like the official tables).
+            windows (list[int], optional): Numbers of Games of the season for rolling totals, for example
+                [3] adds 'gold_last_3', ..., 'total_last_3', the medals of the Games and the two previous
+                Games of its season. Defaults to None (no rolling totals).
+            merge_countries (bool, optional): Without df, whether to use the standardized country names of
+                get_medals_by_std_country_name instead. This combines teams that competed separately at the
+                same Games into one row, for example East and West Germany into 'Germany', so the ranks are
+                no longer those of the official tables. Defaults to False.
+
+        Returns:
+            pd.DataFrame: One row per Games ('game_season', 'game_year') and country with a medal, with
+            'gold', 'silver', 'bronze', 'total', 'rank', the 'cum_' totals and the rolling totals,
+            sorted by season, year and rank.
+        """
+        count_cols = list(self.medal_type_cols.values()) + ['total']
+        games_cols = ['game_season', 'game_year']
+        if df is None and not merge_countries:
+            df = self._get_stage('medals_by_country', self._build_medals_by_country)
+        counts = self.get_medal_cube(df).sum(games_cols + ['country_name', 'medal_type'])
+        df_standings = counts.unstack('medal_type', fill_value=0)\
+            .reindex(columns=list(self.medal_type_cols), fill_value=0)\
+            .rename(columns=self.medal_type_cols)
+        df_standings.columns.name = None
+        df_standings['total'] = df_standings.sum(axis=1)
+        df_standings = df_standings.reset_index()
+
+        # Gold-first rank: order by golds, then silvers, then bronzes as one integer key
+        base = int(df_standings[count_cols].to_numpy().max()) + 1
+        key = (df_standings['gold'] * base + df_standings['silver']) * base + df_standings['bronze']
+        df_standings['rank'] = key.groupby([df_standings[col] for col in games_cols])\
+            .rank(method='min', ascending=False).astype(np.int64)
+
+        # Cumulative totals per country and season, in Games order
+        df_standings = df_standings.sort_values(['game_season', 'country_name', 'game_year'], ignore_index=True)
+        country_groups = df_standings.groupby(['game_season', 'country_name'], observed=True, sort=False)
+        cum = country_groups[count_cols].cumsum().to_numpy()
+        df_standings[[f'cum_{col}' for col in count_cols]] = cum
+
+        if windows:
+            # Position of the Games in its season, and one sorted key per country row
+            game_pos = df_standings.groupby('game_season', observed=True)['game_year']\
+                .rank(method='dense').to_numpy(dtype=np.int64)
+            group_ids = country_groups.ngroup().to_numpy(dtype=np.int64)
+            pos_base = int(game_pos.max()) + 1
+            keys = group_ids * pos_base + game_pos
+            for window in windows:
+                # The totals to subtract are the cumulative totals of the last Games before the window
+                prev = np.searchsorted(keys, keys - window, side='right') - 1
+                has_prev = (prev >= 0) & (group_ids[np.maximum(prev, 0)] == group_ids)
+                rolling = cum - np.where(has_prev[:, None], cum[np.maximum(prev, 0)], 0)
+                df_standings[[f'{col}_last_{window}' for col in count_cols]] = rolling
+
+        return df_standings.sort_values(games_cols + ['rank', 'country_name'], ignore_index=True)
 
     def get_discipline_game_heatmap(self, df: pd.DataFrame, season: str) -> pd.DataFrame:
         """
@@ -377,16 +1228,13 @@ class KaggleOlympicGamesMedals:
         - pd.DataFrame: A heatmap DataFrame representing the count of medals in each discipline
         over the game years.
         """
-        # Filter by season and reset the index
-        # Group by discipline and game year and count the number of medals
-        df_heatmap = df[df['game_season'] == season].reset_index(drop=True)
-        df_heatmap = df_heatmap.groupby(
-            ['discipline_title', 'game_year']
-        )['participant_type'].count().reset_index()
+        return self._cached_result('get_discipline_game_heatmap', {'season': season},
+                                   lambda: self._discipline_game_heatmap(df, season), df)
 
-        # Pivot the dataframe with discipline_title values as rows (index) and game_year values as columns
-        df_heatmap = df_heatmap.pivot(
-            index='discipline_title', columns='game_year', values='participant_type')
+    def _discipline_game_heatmap(self, df: pd.DataFrame, season: str) -> pd.DataFrame:
+        # Count the number of medals by discipline (rows) and game year (columns) for the season
+        df_heatmap = self.get_medal_cube(df).pivot(
+            'discipline_title', 'game_year', game_season=season)
         df_heatmap[df_heatmap > 0] = 1
         column_list = list(df_heatmap.columns)
         most_current_game_year = column_list[-1]
@@ -426,29 +1274,26 @@ class KaggleOlympicGamesMedals:
         game_name_list_sorted = [' '.join(i) for i in game_name_tuple_sorted]
         return game_name_list_sorted
 
-    def get_country_medal_heatmap(self, df: pd.DataFrame, country: str) -> pd.DataFrame:
+    def get_country_medal_heatmap(self, df: pd.DataFrame, country: str, season: str | None = None) -> pd.DataFrame:
         """
         Generates a heatmap DataFrame based on the input DataFrame filtered by a specific country.
 
         Parameters:
             - df (pd.DataFrame): The input DataFrame containing data of various disciplines and participant types.
             - country (str): The specific country to filter the data by.
+            - season (str, optional): The season to filter the data by. Defaults to None (all seasons).
 
         Returns:
             - pd.DataFrame: A heatmap DataFrame representing the count of medals in each discipline
             over the game names.
         """
-        # Get data for given country
-        df_medal = df[df['country_name'] == country]
-
-        # Group by game_name and discipline_title and count number of medals
-        df_medal = df_medal.groupby(
-            ['game_name', 'discipline_title']
-        )['participant_type'].count().reset_index()
+        return self._cached_result('get_country_medal_heatmap', {'country': country, 'season': season},
+                                   lambda: self._country_medal_heatmap(df, country, season), df)
 
-        # Reorient dataframe with discipline_title values as rows (index) and game_name values as columns via pivot
-        df_medal = df_medal.pivot(
-            index='discipline_title', columns='game_name', values='participant_type')
+    def _country_medal_heatmap(self, df: pd.DataFrame, country: str, season: str | None) -> pd.DataFrame:
+        # Count the number of medals by discipline (rows) and game name (columns) for the given country
+        filters = {'country_name': country} if season is None else {'country_name': country, 'game_season': season}
+        df_medal = self.get_medal_cube(df).pivot('discipline_title', 'game_name', **filters)
 
         # Reorder columns by sorted game_name column values by year ascending
         df_medal = df_medal[self._sort_game_names(list(df_medal.columns))]
@@ -487,21 +1332,22 @@ class KaggleOlympicGamesMedals:
         Returns:
             pd.DataFrame - the heatmap of medals for the specified country, discipline, and gender
         """
-        df_discipline = df[
-            (df['game_season'] == season) &
-            (df['country_name'] == country) &
-            (df['discipline_title'] == discipline) &
-            (df['event_gender'] == gender)
-        ].reset_index(drop=True)
-
-        # Group by game_name and event_title and count number of medals
-        df_discipline = df_discipline.groupby(
-            ['game_name', 'event_title']
-        )['participant_type'].count().reset_index()
+        args = {'season': season, 'country': country, 'discipline': discipline, 'gender': gender}
+        return self._cached_result(
+            'get_country_discipline_gender_medal_heatmap', args,
+            lambda: self._country_discipline_gender_medal_heatmap(df, season, country, discipline, gender), df)
 
-        # Reorient dataframe with event_title values as rows (index) and game_name values as columns via pivot
-        df_discipline = df_discipline.pivot(
-            index='event_title', columns='game_name', values='participant_type')
+    def _country_discipline_gender_medal_heatmap(
+            self,
+            df: pd.DataFrame,
+            season: str,
+            country: str,
+            discipline: str,
+            gender: str) -> pd.DataFrame:
+        # Count the number of medals by event (rows) and game name (columns) for the given slice
+        df_discipline = self.get_medal_cube(df).pivot(
+            'event_title', 'game_name',
+            game_season=season, country_name=country, discipline_title=discipline, event_gender=gender)
 
         # Reorder columns by sorted game_name column values by year ascending
         df_discipline = df_discipline[self._sort_game_names(
@@ -537,17 +1383,36 @@ class KaggleOlympicGamesMedals:
             None
         """
         plt.figure(figsize=size)
-        ax = sns.heatmap(df, annot=False, cbar=False,
-                         linewidths=0.8, linecolor='lightgrey',
-                         square=True, cmap='Spectral')
+        self._draw_discipline_games_heatmap(plt.gca(), df, title)
+        plt.tight_layout()
+        if save:
+            plt.savefig(self._discipline_games_heatmap_file_name(title), dpi=200)
+        plt.show()
+
+    def _draw_discipline_games_heatmap(self, ax, df: pd.DataFrame, title: str):
+        """
+        Draws the disciplines contested heatmap of plot_discipline_games_heatmap on the given axes.
+        Internal use only.
+        """
+        sns.heatmap(df, ax=ax, annot=False, cbar=False,
+                    linewidths=0.8, linecolor='lightgrey',
+                    square=True, cmap='Spectral')
         ax.set_title(
             f'Disciplines Contested at the {title} Olympic Games', size=18)
         ax.xaxis.tick_top()
         ax.spines[['bottom', 'right']].set_visible(True)
-        plt.tight_layout()
-        if save:
-            plt.savefig(f'{title.lower()}_games.png', dpi=200)
-        plt.show()
+
+    def _file_name_part(self, value: str) -> str:
+        """
+        Returns the value in lower case with path separators replaced by '-', so names like
+        'Baseball/Softball' stay one file name. Internal use only.
+        """
+        for sep in {'/', '\\', os.sep}:
+            value = value.replace(sep, '-')
+        return value.lower()
+
+    def _discipline_games_heatmap_file_name(self, title: str) -> str:
+        return f'{self._file_name_part(title)}_games.png'
 
     def plot_country_medal_heatmap(self, df: pd.DataFrame, country: str, season: str, figsize=(16, 16), save=False):
         """
@@ -563,16 +1428,25 @@ class KaggleOlympicGamesMedals:
         """
         # Create the heatmap with annotations
         plt.figure(figsize=figsize)
-        ax = sns.heatmap(df, annot=True, fmt='g',
-                         linewidths=0.8, cmap='coolwarm')
-        ax.set_title(f'{country} {season} Medals', size=18)
-        ax.xaxis.tick_top()
+        self._draw_country_medal_heatmap(plt.gca(), df, country, season)
         plt.tight_layout()
         if save:
-            plt.savefig(
-                f'{country.lower()}_{season.lower()}_medals.png', dpi=200)
+            plt.savefig(self._country_medal_heatmap_file_name(country, season), dpi=200)
         plt.show()
 
+    def _draw_country_medal_heatmap(self, ax, df: pd.DataFrame, country: str, season: str):
+        """
+        Draws the annotated country medals heatmap of plot_country_medal_heatmap on the given axes.
+        Internal use only.
+        """
+        sns.heatmap(df, ax=ax, annot=True, fmt='g',
+                    linewidths=0.8, cmap='coolwarm')
+        ax.set_title(f'{country} {season} Medals', size=18)
+        ax.xaxis.tick_top()
+
+    def _country_medal_heatmap_file_name(self, country: str, season: str) -> str:
+        return f'{self._file_name_part(country)}_{self._file_name_part(season)}_medals.png'
+
     def plot_country_discipline_gender_medal_heatmap(
             self,
             df: pd.DataFrame,
@@ -584,25 +1458,397 @@ class KaggleOlympicGamesMedals:
             save=False):
 
         plt.figure(figsize=figsize)
-        ax = sns.heatmap(df, annot=True, fmt='g',
-                         linewidths=0.8, cmap='coolwarm')
-        ax.set_title(
-            f'{country} {season} {discipline} Medals - {gender}', size=22)
-        ax.xaxis.tick_top()
+        self._draw_country_discipline_gender_medal_heatmap(plt.gca(), df, season, country, discipline, gender)
         plt.tight_layout()
         if save:
             plt.savefig(
-                f'{country.lower()}_{season.lower()}_{discipline.lower()}_{gender.lower()}_medals.png', dpi=200)
+                self._country_discipline_gender_medal_heatmap_file_name(season, country, discipline, gender),
+                dpi=200)
         plt.show()
 
+    def _draw_country_discipline_gender_medal_heatmap(
+            self, ax, df: pd.DataFrame, season: str, country: str, discipline: str, gender: str):
+        """
+        Draws the annotated heatmap of plot_country_discipline_gender_medal_heatmap on the given axes.
+        Internal use only.
+        """
+        sns.heatmap(df, ax=ax, annot=True, fmt='g',
+                    linewidths=0.8, cmap='coolwarm')
+        ax.set_title(
+            f'{country} {season} {discipline} Medals - {gender}', size=22)
+        ax.xaxis.tick_top()
+
+    def _country_discipline_gender_medal_heatmap_file_name(
+            self, season: str, country: str, discipline: str, gender: str) -> str:
+        parts = [self._file_name_part(part) for part in (country, season, discipline, gender)]
+        return f'{"_".join(parts)}_medals.png'
+
     def get_country_name_codes(self) -> pd.DataFrame:
         """
         Returns a DataFrame containing the country name and code for each country in the medals dataset.
 
         :return: pd.DataFrame
         """
-        df = self.get_medals_by_country(
-        )[['country_name', 'country_3_letter_code']].set_index('country_name').sort_index()
+        return self._copy_frame(self._get_stage('country_name_codes', self._build_country_name_codes))
+
+    def _build_country_name_codes(self) -> pd.DataFrame:
+        return self._cached_result('get_country_name_codes', {}, lambda: self._country_name_codes(
+            self._get_stage('medals_by_country', self._build_medals_by_country)))
+
+    def _country_name_codes(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = df[['country_name', 'country_3_letter_code']].set_index('country_name').sort_index()
 
         # Drop duplicate country codes
         return df.drop_duplicates(['country_3_letter_code']).reset_index()
+
+    def get_country_dimension(self) -> CountryDimension:
+        """
+        Returns the country dimension of the medals dataset: one integer id per standardized country
+        name (after country_code_to_std_name_map), resolvable from team names, IOC codes, the raw
+        names of country_name_map and the spellings of the other datasets.
+
+        Use it to add a 'country_id' column to the World Bank or World Happiness data and merge on it
+        instead of on the country names. The dimension is shared and must not be modified.
+
+        Returns:
+            CountryDimension: The country dimension.
+        """
+        return self._get_stage('country_dimension', self._build_country_dimension)
+
+    def _build_country_dimension(self) -> CountryDimension:
+        return CountryDimension(
+            self._get_stage('country_name_codes', self._build_country_name_codes),
+            code_to_name_map=self.country_code_to_std_name_map,
+            aliases=self.country_name_map)
+
+    def match_country_names(self, values) -> pd.DataFrame:
+        """
+        Proposes the standardized country name for each country name of an external dataset, using
+        the names already known to the country dimension as aliases.
+
+        Review the result, then add CountryNameMatcher.to_name_map(df_matches) to country_name_map
+        and call invalidate_cache() so get_country_dimension() resolves the new names.
+
+        Parameters:
+            values (array-like): The country names, for example df_gdp['Country Name'].
+
+        Returns:
+            pd.DataFrame: The match table, see CountryNameMatcher.match.
+        """
+        countries = self.get_country_dimension()
+        return CountryNameMatcher(countries.countries['country_name'], countries.name_keys()).match(values)
+
+    def join_country_years(
+            self,
+            df: pd.DataFrame,
+            series: CountryYearSeries,
+            year_col: str = 'game_year',
+            max_lag: int | None = None) -> pd.DataFrame:
+        """
+        Adds the yearly country values of the series (for example GDP or happiness) for the Games year
+        of every row, falling back to the nearest earlier year with a value.
+
+        Example:
+        gdp = CountryYearSeries.from_wide(pd.read_csv('GDP_1960_2023.csv'), ogm.get_country_dimension(), 'gdp')
+        df = ogm.join_country_years(ogm.get_medals_by_std_country_name(), gdp)
+
+        Parameters:
+            df (pd.DataFrame): Medal rows or an aggregate with a country code ('country_3_letter_code'
+                or 'country_code') or 'country_name' column, and a year column or a 'slug_game' or
+                'game_name' column to find the year in the hosts.
+            series (CountryYearSeries): The yearly values, built with get_country_dimension().
+            year_col (str, optional): The year column. Defaults to 'game_year'.
+            max_lag (int, optional): The maximum number of years to fall back. Defaults to None (no limit).
+
+        Returns:
+            pd.DataFrame: A copy of df with the value and '<value>_year' columns of the series.
+        """
+        countries = self.get_country_dimension()
+        code_col = next((col for col in ['country_3_letter_code', 'country_code'] if col in df.columns), None)
+        name_col = 'country_name' if 'country_name' in df.columns else None
+        country_ids = countries.add_ids(df, name_col=name_col, code_col=code_col, kind='ioc')['country_id']
+
+        years = df[year_col] if year_col in df.columns else self._host_values(df, 'game_year')
+        return series.join(df, country_ids, years, max_lag)
+
+    def _host_values(self, df: pd.DataFrame, host_col: str) -> pd.Series | None:
+        """
+        Looks up a hosts column (for example 'game_year') for the Games of every row, from its
+        'slug_game' or 'game_name' column. Internal use only.
+
+        Returns:
+            pd.Series | None: The values, None if df has neither column.
+        """
+        game_col = next((col for col in ['slug_game', 'game_name'] if col in df.columns), None)
+        if game_col is None:
+            return None
+        df_hosts = self.df_hosts
+        key_col = 'game_slug' if game_col == 'slug_game' else 'game_name'
+        return df[game_col].map(pd.Series(df_hosts[host_col].to_numpy(), index=df_hosts[key_col]))
+
+    def write_partitioned_dataset(
+            self,
+            df: pd.DataFrame | str,
+            output_dir: str,
+            compression: str = 'zstd',
+            threads: bool = True) -> list[str]:
+        """
+        Writes a derived frame as a Parquet dataset partitioned by 'game_season' and 'game_year'
+        (output_dir/game_season=Winter/game_year=2010/part-0.parquet), with compressed columns and
+        dictionary encoded strings. Requires pyarrow.
+
+        Consumers read the partitions and columns they need with partitioned_dataset.read_partitioned,
+        for example read_partitioned(output_dir, game_season='Winter', game_year=range(2010, 2023)),
+        instead of parsing a whole CSV file.
+
+        Parameters:
+            df (pd.DataFrame | str): The frame, or the name of one of medal_aggregates. The partition
+                columns it lacks are looked up in the hosts from its 'slug_game' or 'game_name' column;
+                frames without any Games column are written unpartitioned.
+            output_dir (str): The directory of the dataset, replaced if it exists.
+            compression (str, optional): The Parquet compression codec. Defaults to 'zstd'.
+            threads (bool, optional): Whether to write the partitions in parallel threads. Defaults to True.
+
+        Returns:
+            list[str]: The paths of the written files, relative to output_dir.
+        """
+        from partitioned_dataset import PARTITION_COLS, write_partitioned  # requires pyarrow
+
+        if isinstance(df, str):
+            df = self.get_medal_aggregate(df)
+        missing = {col: self._host_values(df, col) for col in PARTITION_COLS if col not in df.columns}
+        df = df.assign(**{col: values for col, values in missing.items() if values is not None})
+        return write_partitioned(df, output_dir, PARTITION_COLS, compression, threads)
+
+    def get_medal_correlations(
+            self,
+            df_indicators: pd.DataFrame,
+            df: pd.DataFrame | None = None,
+            slice_cols: list[str] | None = None,
+            min_countries: int = 5,
+            n_boot: int = 0,
+            ci: float = 0.95,
+            processes: int | None = None,
+            seed: int = 0) -> pd.DataFrame:
+        """
+        Correlates the medal counts of the countries with the country indicators for every slice of
+        season x gender x medal type x discipline (each also 'All') at once, instead of slicing,
+        merging and calling corr() one slice at a time.
+
+        Example:
+        df_corr = ogm.get_medal_correlations(pd.read_csv('../data/etl/happiness_avg_by_country.csv'))
+        df_corr[(df_corr['game_season'] == 'Summer') & (df_corr['event_gender'] == 'Women')
+                & (df_corr['medal_type'] == 'All') & (df_corr['discipline_title'] == 'All')]
+
+        Parameters:
+            df_indicators (pd.DataFrame): One row per country with a 'country_name' (or 'country_id'
+                from get_country_dimension()) column and numeric indicator columns.
+            df (pd.DataFrame, optional): The cleaned medal DataFrame. Defaults to None
+                (get_medals_by_std_country_name()).
+            slice_cols (list[str], optional): The slice columns. Defaults to MedalCorrelations.slice_cols.
+            min_countries (int, optional): Slices with medals of fewer countries are left out. Defaults to 5.
+            n_boot (int, optional): The number of bootstrap samples for confidence intervals,
+                0 to skip them. Defaults to 0.
+            ci (float, optional): The confidence level of the intervals. Defaults to 0.95.
+            processes (int, optional): The number of bootstrap processes. Defaults to None (the number of CPUs).
+            seed (int, optional): The seed of the bootstrap samples. Defaults to 0.
+
+        Returns:
+            pd.DataFrame: See MedalCorrelations.correlations.
+        """
+        correlations = MedalCorrelations(
+            self.get_medal_cube(df), self.get_country_dimension(), df_indicators, slice_cols, min_countries)
+        return correlations.correlations(n_boot, ci, processes, seed)
+
+    def get_medal_aggregate(self, name: str) -> pd.DataFrame:
+        """
+        Returns one of the medal count aggregates declared in medal_aggregates, computed from
+        get_medals_by_std_country_name and cached like the other derived frames.
+
+        Count aggregates have the group columns and 'medal_count'. Aggregates by medal type have the
+        group columns and 'gold', 'silver', 'bronze' and 'total_medals'. A 'country_3_letter_code'
+        group column is named 'country_code'. Rows are sorted by the group columns.
+
+        Parameters:
+            name (str): The aggregate name, for example 'medals_by_country'.
+
+        Returns:
+            pd.DataFrame: A copy of the aggregate.
+
+        Raises:
+            ValueError: If the name is not a key of medal_aggregates.
+        """
+        if name not in self.medal_aggregates:
+            raise ValueError(f"Unknown medal aggregate '{name}', expected one of {list(self.medal_aggregates)}")
+        df_std = self._get_stage('medals_by_std_country_name', self._build_medals_by_std_country_name)
+        return self._copy_frame(self._get_stage(
+            self.aggregate_stage_prefix + name, lambda: self._medal_aggregate(df_std, name)))
+
+    def _medal_aggregate(self, df: pd.DataFrame, name: str) -> pd.DataFrame:
+        """
+        Computes the named medal aggregate of the given standardized medals frame.
+        Internal use only.
+        """
+        spec = self.medal_aggregates[name]
+        group_cols = spec['group_cols']
+        if not spec.get('by_medal_type'):
+            df_agg = df.groupby(group_cols, observed=True)['participant_type'].count().reset_index()
+            df_agg.rename(columns={'participant_type': 'medal_count'}, inplace=True)
+        else:
+            df_agg = df.groupby(group_cols + ['medal_type'], observed=True)['participant_type'].count()\
+                .unstack('medal_type')
+            df_agg.columns = list(df_agg.columns)
+            df_agg = df_agg.reindex(columns=list(self.medal_type_cols)).astype(float)\
+                .rename(columns=self.medal_type_cols)
+            if 'fill_value' in spec:
+                df_agg = df_agg.fillna(spec['fill_value'])
+            df_agg['total_medals'] = df_agg.sum(axis=1)
+            df_agg = df_agg.reset_index()
+        return df_agg.rename(columns={'country_3_letter_code': 'country_code'})
+
+    def _combine_medal_aggregates(self, df_old: pd.DataFrame, df_new: pd.DataFrame, name: str) -> pd.DataFrame:
+        """
+        Adds the counts of a medal aggregate of new rows to the same aggregate of the existing rows.
+        Internal use only.
+        """
+        group_cols = [{'country_3_letter_code': 'country_code'}.get(col, col)
+                      for col in self.medal_aggregates[name]['group_cols']]
+        value_cols = [col for col in df_old.columns if col not in group_cols]
+        # min_count keeps a medal type missing when it is missing on both sides
+        df_combined = self._concat_frames([df_old, df_new])\
+            .groupby(group_cols, observed=True)[value_cols].sum(min_count=1)\
+            .astype(df_old[value_cols].dtypes.to_dict())
+        if 'total_medals' in value_cols:
+            df_combined['total_medals'] = df_combined[list(self.medal_type_cols.values())].sum(axis=1)
+        return df_combined.reset_index()
+
+    def write_medal_aggregates(self, output_dir: str, names: list[str] | None = None) -> list[str]:
+        """
+        Writes medal aggregates to CSV files named after the aggregates, for example
+        data/etl/medals_by_country.csv.
+
+        Parameters:
+            output_dir (str): The directory to write to.
+            names (list[str], optional): The aggregates to write. Defaults to all medal_aggregates.
+
+        Returns:
+            list[str]: The paths of the written files.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        paths = []
+        for name in names or self.medal_aggregates:
+            paths.append(f'{output_dir}/{name}.csv')
+            self.get_medal_aggregate(name).to_csv(paths[-1], index=False)
+        return paths
+
+    def write_medal_store(self, db_path: str, etl_dir: str | None = None) -> MedalStore:
+        """
+        Writes the standardized medals, the medals by country, the hosts with country codes and the
+        ETL tables to a SQLite database with indexes on the country, game, season, discipline and
+        gender columns. Tools then read small slices of it with MedalStore.query instead of loading
+        and cleaning the full history.
+
+        Parameters:
+            db_path (str): The path of the database file, replaced if it exists.
+            etl_dir (str, optional): The directory of the ETL CSV files to add, for example data/etl.
+                Defaults to None (no ETL tables).
+
+        Returns:
+            MedalStore: The store of the database.
+        """
+        store = MedalStore(db_path)
+        store.write(self, etl_dir)
+        return store
+
+    @staticmethod
+    def query_medal_store(db_path: str, **kwargs) -> pd.DataFrame:
+        """
+        Reads a slice of a database written by write_medal_store, the filters and group-bys running in
+        SQLite. The data of this object is not loaded.
+
+        Example:
+        KaggleOlympicGamesMedals.query_medal_store(
+            'medals.sqlite', group_by=['game_year', 'medal_type'], country_name='Kenya', game_season='Summer')
+
+        Parameters:
+            db_path (str): The path of the database file.
+            **kwargs: The arguments of MedalStore.query: table, columns, group_by, aggregates,
+                order_by, limit and the column filters.
+
+        Returns:
+            pd.DataFrame: The matching rows or groups.
+        """
+        return MedalStore(db_path).query(**kwargs)
+
+    def append_games(self, df_new_medals: pd.DataFrame, df_new_hosts: pd.DataFrame) -> None:
+        """
+        Adds the medals of new Games without reprocessing the existing history.
+
+        Only the new medal rows are merged with the hosts and cleaned. Derived frames that have
+        already been computed (merged and cleaned medals, medals by country, standardized country
+        names, country codes and the medal aggregates) are extended with the new rows, the hosts with
+        country codes are rebuilt on next use and cached cubes and indexes are dropped.
+
+        Parameters:
+            df_new_medals (pd.DataFrame): The medal rows of the new Games, with the columns of olympic_medals.csv.
+            df_new_hosts (pd.DataFrame): The host rows of the new Games, with the columns of olympic_hosts.csv.
+
+        Raises:
+            ValueError: If a new game is already loaded, or a new medal row is not for one of the new games.
+        """
+        new_slugs = set(df_new_hosts['game_slug'])
+        existing_slugs = new_slugs.intersection(self.df_hosts['game_slug'])
+        if existing_slugs:
+            raise ValueError(f'Games already loaded: {sorted(existing_slugs)}')
+        unknown_slugs = set(df_new_medals['slug_game']) - new_slugs
+        if unknown_slugs:
+            raise ValueError(f'Medal rows for games not in df_new_hosts: {sorted(unknown_slugs)}')
+
+        if self.compact:
+            df_new_medals = self._to_compact(df_new_medals)
+            df_new_hosts = self._to_compact(df_new_hosts)
+        # Assign without the setters, they would drop every derived frame
+        self._assign_dataset('hosts', self._concat_frames([self.df_hosts, df_new_hosts]))
+        n_medals = len(self.df_medals)
+        self._assign_dataset('medals', self._concat_frames([self.df_medals, df_new_medals]))
+
+        # Merge and clean the new rows only, numbering them after the existing rows
+        df_merged = self._merge_hosts(df_new_medals)
+        df_merged.index = pd.RangeIndex(n_medals, n_medals + len(df_merged))
+        df_cleaned = self._clean_data(df_merged.copy())
+        df_by_country = self._medals_by_country(df_cleaned)
+        df_std = self._std_country_names(df_by_country.copy())
+
+        for stage, df_new in [('medals_merged', df_merged),
+                              ('medals_cleaned', df_cleaned),
+                              ('medals_by_country', df_by_country),
+                              ('medals_by_std_country_name', df_std)]:
+            if stage in self._stages:
+                self._stages[stage] = self._concat_frames([self._stages[stage], df_new])
+        if 'country_name_codes' in self._stages:
+            self._stages['country_name_codes'] = self._country_name_codes(
+                self._concat_frames([self._stages['country_name_codes'], df_by_country]))
+        for stage in list(self._stages):
+            if stage.startswith(self.aggregate_stage_prefix):
+                name = stage[len(self.aggregate_stage_prefix):]
+                self._stages[stage] = self._combine_medal_aggregates(
+                    self._stages[stage], self._medal_aggregate(df_std, name), name)
+        self._stages.pop('country_dimension', None)
+        self._stages.pop('hosts_with_country_codes', None)
+        self._frame_caches.clear()
+
+    def _concat_frames(self, frames: list[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Concatenates DataFrames, combining the categories of categorical columns so they stay categorical.
+        Internal use only.
+        """
+        frames = [df for df in frames if len(df.columns) > 0]
+        cols = frames[0].columns
+        for col in cols:
+            if any(isinstance(df[col].dtype, pd.CategoricalDtype) for df in frames if col in df.columns):
+                categories = sorted(set().union(*[
+                    df[col].cat.categories if isinstance(df[col].dtype, pd.CategoricalDtype)
+                    else df[col].dropna().unique() for df in frames if col in df.columns]))
+                frames = [df.astype({col: pd.CategoricalDtype(categories)}) if col in df.columns else df
+                          for df in frames]
+        return pd.concat(frames)
@@ -0,0 +1,225 @@
+# Import libraries
+import argparse
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+import tracemalloc  # peak memory of each benchmark
+
+import numpy as np  # linear algebra
+import pandas as pd  # data processing, CSV file I/O (e.g. pd.read_csv)
+
+from kaggle_olympic_games_medals import KaggleOlympicGamesMedals
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        'data', 'kaggle', 'olympic-games-medals')
+
+
+def synthesize_medals(df_hosts: pd.DataFrame, df_medals: pd.DataFrame, scale: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Scales the hosts and medals datasets up by repeating the whole Olympic history scale times.
+
+    Every copy k > 0 gets new Games: the slugs and names get a '-k' suffix and the years are moved
+    after the previous copy, so the medals of the copies do not collapse into the same Games and each
+    method sees scale times the Games, medals and athletes of the real data.
+
+    Parameters:
+        df_hosts (pd.DataFrame): The hosts dataset.
+        df_medals (pd.DataFrame): The medals dataset.
+        scale (int): The number of copies, 1 returns the data unchanged.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: The scaled hosts and medals datasets.
+    """
+    if scale == 1:
+        return df_hosts, df_medals
+    year_span = int(df_hosts['game_year'].max() - df_hosts['game_year'].min()) + 4
+
+    def copy_suffix(copies: np.ndarray, sep: str) -> np.ndarray:
+        # No suffix for the first copy so it keeps the real Games
+        return np.array([''] + [f'{sep}{k}' for k in range(1, scale)], dtype=object)[copies]
+
+    host_copies = np.repeat(np.arange(scale), len(df_hosts))
+    df_hosts = pd.concat([df_hosts] * scale, ignore_index=True)
+    df_hosts['game_slug'] = df_hosts['game_slug'].astype(str) + copy_suffix(host_copies, '-')
+    df_hosts['game_name'] = df_hosts['game_name'].astype(str) + copy_suffix(host_copies, ' #')
+    df_hosts['game_year'] = df_hosts['game_year'] + host_copies * year_span
+
+    medal_copies = np.repeat(np.arange(scale), len(df_medals))
+    df_medals = pd.concat([df_medals] * scale, ignore_index=True)
+    df_medals['slug_game'] = df_medals['slug_game'].astype(str) + copy_suffix(medal_copies, '-')
+    return df_hosts, df_medals
+
+
+def _measure(setup, func, repeat: int) -> dict:
+    """
+    Returns the best time of repeat calls of func(setup()) and the peak memory allocated by one
+    traced call. The setup is neither timed nor traced.
+    """
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        func(state)
+        times.append(time.perf_counter() - start)
+    state = setup()
+    tracemalloc.start()
+    try:
+        func(state)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'seconds': round(min(times), 6), 'peak_bytes': int(peak)}
+
+
+def benchmark_cases(data_dir: str, compact: bool = False) -> dict:
+    """
+    Returns the benchmarks by name as (setup, func) pairs, func is timed on the result of setup.
+
+    Except for the constructor, which includes reading the hosts and medals files, every benchmark
+    runs on a new KaggleOlympicGamesMedals object with the datasets loaded, so it includes building
+    the derived frames it depends on. The heatmap getters get the standardized medals and include
+    building the medal cube of their first call.
+    """
+    def new_ogm() -> KaggleOlympicGamesMedals:
+        ogm = KaggleOlympicGamesMedals(data_dir, compact=compact)
+        ogm.load_data(['hosts', 'medals'])
+        return ogm
+
+    def with_merged_medals() -> tuple[KaggleOlympicGamesMedals, pd.DataFrame]:
+        ogm = new_ogm()
+        return ogm, ogm._get_medals_merged()
+
+    def with_std_medals() -> tuple[KaggleOlympicGamesMedals, pd.DataFrame]:
+        ogm = new_ogm()
+        return ogm, ogm.get_medals_by_std_country_name()
+
+    # Heatmap arguments with data in every copy of the synthetic data
+    season, country, discipline, gender = 'Summer', 'United States', 'Athletics', 'Men'
+
+    return {
+        'constructor': (lambda: None, lambda _: new_ogm()),
+        'get_medals_by_country': (new_ogm, lambda ogm: ogm.get_medals_by_country()),
+        'get_medals_by_std_country_name': (new_ogm, lambda ogm: ogm.get_medals_by_std_country_name()),
+        'get_hosts_with_country_codes': (new_ogm, lambda ogm: ogm.get_hosts_with_country_codes()),
+        'pre_process_medal_counts': (
+            with_merged_medals,
+            lambda args: args[0].pre_process_medal_counts(args[1])),
+        'get_discipline_game_heatmap': (
+            with_std_medals,
+            lambda args: args[0].get_discipline_game_heatmap(args[1], season)),
+        'get_country_medal_heatmap': (
+            with_std_medals,
+            lambda args: args[0].get_country_medal_heatmap(args[1], country, season)),
+        'get_country_discipline_gender_medal_heatmap': (
+            with_std_medals,
+            lambda args: args[0].get_country_discipline_gender_medal_heatmap(
+                args[1], season, country, discipline, gender))
+    }
+
+
+def run_benchmarks(
+        scales: list[int] | None = None,
+        names: list[str] | None = None,
+        repeat: int = 3,
+        compact: bool = False,
+        data_dir: str = DATA_DIR) -> dict:
+    """
+    Times the benchmarks on the real data scaled up by each factor.
+
+    The scaled datasets are written to a temporary directory so the constructor reads them like the
+    real files. Scales of 100 and 1000 need a lot of memory and disk space (the medals file is about
+    3 MB per copy).
+
+    Parameters:
+        scales (list[int], optional): The scale factors. Defaults to None ([1, 10]).
+        names (list[str], optional): The benchmarks to run. Defaults to all of them.
+        repeat (int, optional): The number of timed calls, the best time is kept. Defaults to 3.
+        compact (bool, optional): Whether to benchmark the compact mode. Defaults to False.
+        data_dir (str, optional): The directory of the real data. Defaults to the repository data.
+
+    Returns:
+        dict: The run environment under 'meta' and one entry per benchmark and scale under 'results'
+        with 'benchmark', 'scale', 'medal_rows', 'seconds' and 'peak_bytes'.
+    """
+    ogm = KaggleOlympicGamesMedals(data_dir)
+    df_hosts = pd.read_csv(os.path.join(data_dir, ogm.hosts_file_name))
+    df_medals = pd.read_csv(os.path.join(data_dir, ogm.medals_file_name))
+    results = []
+    for scale in scales or [1, 10]:
+        scaled_dir = tempfile.mkdtemp(prefix=f'medals_x{scale}_')
+        try:
+            df_scaled_hosts, df_scaled_medals = synthesize_medals(df_hosts, df_medals, scale)
+            df_scaled_hosts.to_csv(os.path.join(scaled_dir, ogm.hosts_file_name), index=False)
+            df_scaled_medals.to_csv(os.path.join(scaled_dir, ogm.medals_file_name), index=False)
+            medal_rows = len(df_scaled_medals)
+            del df_scaled_hosts, df_scaled_medals
+
+            cases = benchmark_cases(scaled_dir, compact)
+            for name in names or cases:
+                results.append({'benchmark': name, 'scale': scale, 'medal_rows': medal_rows,
+                                **_measure(*cases[name], repeat)})
+        finally:
+            shutil.rmtree(scaled_dir, ignore_errors=True)
+
+    meta = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'compact': compact,
+        'repeat': repeat
+    }
+    return {'meta': meta, 'results': results}
+
+
+def compare_benchmarks(results: dict, baseline: dict, tolerance: float = 0.2) -> pd.DataFrame:
+    """
+    Compares a benchmark run with a baseline run.
+
+    Parameters:
+        results (dict): The run, as returned by run_benchmarks.
+        baseline (dict): The baseline run.
+        tolerance (float, optional): The relative slowdown or memory increase flagged as a regression.
+            Defaults to 0.2.
+
+    Returns:
+        pd.DataFrame: One row per benchmark and scale in both runs with the seconds and peak bytes of
+        both, their ratios (run / baseline) and a 'regression' flag.
+    """
+    keys = ['benchmark', 'scale']
+    df = pd.DataFrame(results['results']).merge(
+        pd.DataFrame(baseline['results']), on=keys, suffixes=('', '_baseline'))
+    df['time_ratio'] = df['seconds'] / df['seconds_baseline']
+    df['memory_ratio'] = df['peak_bytes'] / df['peak_bytes_baseline']
+    df['regression'] = (df['time_ratio'] > 1 + tolerance) | (df['memory_ratio'] > 1 + tolerance)
+    return df[keys + ['seconds', 'seconds_baseline', 'time_ratio',
+                      'peak_bytes', 'peak_bytes_baseline', 'memory_ratio', 'regression']]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark KaggleOlympicGamesMedals on scaled up medal data.')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10], help='scale factors, e.g. 1 10 100 1000')
+    parser.add_argument('--benchmarks', nargs='+', default=None, help='benchmarks to run (default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='timed calls per benchmark')
+    parser.add_argument('--compact', action='store_true', help='benchmark the compact mode')
+    parser.add_argument('--output', default=None, help='JSON file the results are written to')
+    parser.add_argument('--baseline', default=None, help='JSON file of a previous run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='relative change flagged as a regression')
+    args = parser.parse_args()
+
+    run = run_benchmarks(args.scales, args.benchmarks, args.repeat, args.compact)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(run, f, indent=2)
+    print(pd.DataFrame(run['results']).to_string(index=False))
+    if args.baseline:
+        with open(args.baseline) as f:
+            df_compare = compare_benchmarks(run, json.load(f), args.tolerance)
+        print(df_compare.to_string(index=False))
+        if df_compare['regression'].any():
+            raise SystemExit(1)
@@ -0,0 +1,191 @@
+# Import libraries
+import itertools
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np  # linear algebra
+import pandas as pd  # data processing
+
+from country_dimension import CountryDimension
+from medal_cube import MedalCube
+
+
+def _pearson(counts: np.ndarray, has_medals: np.ndarray, values: np.ndarray, has_value: np.ndarray,
+             weights: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the Pearson correlation of every slice with every indicator over the countries having
+    both a medal in the slice and a value for the indicator, like DataFrame.corr() on one merged slice.
+
+    Parameters:
+        counts (np.ndarray): Medal counts, slices x countries.
+        has_medals (np.ndarray): Whether the country won a medal in the slice, slices x countries.
+        values (np.ndarray): Indicator values centered per indicator with missing values set to 0,
+            countries x indicators.
+        has_value (np.ndarray): Whether the indicator value is present, countries x indicators.
+        weights (np.ndarray, optional): Number of times each country is drawn, for the bootstrap.
+            Defaults to None (each country once).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The correlations and the numbers of countries, slices x indicators.
+    """
+    w = has_medals if weights is None else has_medals * weights
+    wm = w * counts
+    n = w @ has_value
+    sum_m = wm @ has_value
+    sum_m2 = (wm * counts) @ has_value
+    sum_x = w @ values
+    sum_x2 = w @ (values * values)
+    sum_mx = wm @ values
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sum_mx - sum_m * sum_x / n
+        var_m = sum_m2 - sum_m * sum_m / n
+        var_x = sum_x2 - sum_x * sum_x / n
+        r = cov / np.sqrt(var_m * var_x)
+    # Constant values (up to rounding) and slices with less than two countries have no correlation
+    r[(n < 2) | (var_m <= 1e-12 * sum_m2) | (var_x <= 1e-12 * sum_x2)] = np.nan
+    return np.clip(r, -1.0, 1.0), n
+
+
+def _bootstrap_chunk(counts: np.ndarray, has_medals: np.ndarray, values: np.ndarray, has_value: np.ndarray,
+                     n_boot: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """
+    Computes the correlations of n_boot bootstrap samples of the countries.
+
+    Returns:
+        np.ndarray: The correlations, samples x slices x indicators, as float32.
+    """
+    rng = np.random.default_rng(seed)
+    n_countries = counts.shape[1]
+    result = np.empty((n_boot, counts.shape[0], values.shape[1]), dtype=np.float32)
+    for i in range(n_boot):
+        # Resampling countries with replacement is weighting each country by its number of draws
+        weights = np.bincount(rng.integers(0, n_countries, n_countries), minlength=n_countries)
+        result[i] = _pearson(counts, has_medals, values, has_value, weights)[0]
+    return result
+
+
+class MedalCorrelations:
+    """
+    Correlations of the medal counts of countries with country indicators (happiness, GDP,
+    nutrition, ...) for every slice of the medals at once.
+
+    A slice is one value, or 'All', for each slice column, for example Summer x Women x GOLD x All
+    disciplines. The medal counts of every slice and country are rolled up from a MedalCube in one
+    pass, then the correlations of all slices with all indicators are computed with a few matrix
+    products. As in the notebooks, a slice only includes the countries with a medal in it, and each
+    correlation uses the countries that also have a value for the indicator.
+
+    Bootstrap confidence intervals resample the countries and are computed in a process pool.
+    """
+
+    # Columns whose values, plus 'All', make up the slices
+    slice_cols: list[str] = [
+        'game_season',
+        'event_gender',
+        'medal_type',
+        'discipline_title'
+    ]
+
+    # Label of the slice level that includes every value of a column
+    all_label = 'All'
+
+    def __init__(
+            self,
+            cube: MedalCube,
+            countries: CountryDimension,
+            df_indicators: pd.DataFrame,
+            slice_cols: list[str] | None = None,
+            min_countries: int = 5):
+        """
+        Computes the medal counts of every slice.
+
+        Parameters:
+            cube (MedalCube): The cube of the medals, with a 'country_name' dimension.
+            countries (CountryDimension): The dimension resolving the cube and indicator countries.
+            df_indicators (pd.DataFrame): One row per country with a 'country_id' or 'country_name'
+                column and the numeric indicator columns. Rows of the same country are averaged.
+            slice_cols (list[str], optional): The slice columns, dimensions of the cube.
+                Defaults to the slice_cols attribute.
+            min_countries (int, optional): Slices with medals of fewer countries are left out. Defaults to 5.
+        """
+        self.slice_cols = slice_cols or self.slice_cols
+
+        # Indicators aligned to the countries of the cube
+        if 'country_id' not in df_indicators.columns:
+            df_indicators = countries.add_ids(df_indicators, name_col='country_name')
+        self.indicators = [col for col in df_indicators.select_dtypes('number').columns if col != 'country_id']
+        df_values = df_indicators[df_indicators['country_id'] >= 0].groupby('country_id')[self.indicators].mean()
+        cube_country_ids = countries.ids(cube.labels['country_name'])
+        values = df_values.reindex(cube_country_ids).to_numpy(dtype=np.float64)
+        self.has_value = ~np.isnan(values)
+        # Centering keeps the sums of squares of large values (GDP) precise
+        self.values = np.where(self.has_value, values - np.nanmean(values, axis=0), 0.0)
+
+        # Medal counts per slice column value and country, one extra position per column for 'All'
+        sizes = [len(cube.labels[col]) for col in self.slice_cols]
+        n_countries = len(cube.labels['country_name'])
+        cells = cube._select({}, self.slice_cols + ['country_name'])
+        dense = np.zeros([size + 1 for size in sizes] + [n_countries])
+        np.add.at(dense, tuple(cube.coords[col][cells] for col in self.slice_cols + ['country_name']),
+                  cube.counts[cells])
+        for axis, size in enumerate(sizes):
+            index = [slice(None)] * dense.ndim
+            index[axis] = size
+            dense[tuple(index)] = np.delete(dense, size, axis=axis).sum(axis=axis)
+
+        counts = dense.reshape(-1, n_countries)
+        keep = (counts > 0).sum(axis=1) >= min_countries
+        self.counts = counts[keep]
+        self.has_medals = (self.counts > 0).astype(np.float64)
+        labels = [list(cube.labels[col]) + [self.all_label] for col in self.slice_cols]
+        slices = np.array(list(itertools.product(*labels)), dtype=object).reshape(-1, len(self.slice_cols))
+        self.slices = pd.DataFrame(slices[keep], columns=self.slice_cols)
+
+    def correlations(
+            self,
+            n_boot: int = 0,
+            ci: float = 0.95,
+            processes: int | None = None,
+            seed: int = 0) -> pd.DataFrame:
+        """
+        Returns the correlation of the medal counts with every indicator for every slice.
+
+        Parameters:
+            n_boot (int, optional): The number of bootstrap samples for the confidence intervals,
+                0 to skip them. Defaults to 0.
+            ci (float, optional): The confidence level of the intervals. Defaults to 0.95.
+            processes (int, optional): The number of bootstrap processes, 1 computes them in the
+                current process. Defaults to None (the number of CPUs).
+            seed (int, optional): The seed of the bootstrap samples. Defaults to 0.
+
+        Returns:
+            pd.DataFrame: One row per slice and indicator with the slice columns, 'indicator',
+            'countries' (the number of countries used) and 'r', plus 'ci_low' and 'ci_high' if n_boot > 0.
+        """
+        r, n = _pearson(self.counts, self.has_medals, self.values, self.has_value)
+        df = self.slices.loc[self.slices.index.repeat(len(self.indicators))].reset_index(drop=True)
+        df['indicator'] = np.tile(self.indicators, len(self.slices))
+        df['countries'] = n.ravel().astype(np.int64)
+        df['r'] = r.ravel()
+
+        if n_boot > 0:
+            processes = min(processes or os.cpu_count() or 1, n_boot)
+            chunks = np.array_split(np.arange(n_boot), processes)
+            seeds = np.random.SeedSequence(seed).spawn(processes)
+            args = [(self.counts, self.has_medals, self.values, self.has_value, len(chunk), chunk_seed)
+                    for chunk, chunk_seed in zip(chunks, seeds)]
+            if processes == 1:
+                samples = [_bootstrap_chunk(*arg) for arg in args]
+            else:
+                with ProcessPoolExecutor(processes) as executor:
+                    samples = list(executor.map(_bootstrap_chunk, *zip(*args)))
+            samples = np.concatenate(samples)
+            alpha = (1 - ci) / 2
+            with warnings.catch_warnings():
+                # Slices without a correlation have no interval
+                warnings.simplefilter('ignore', RuntimeWarning)
+                low, high = np.nanquantile(samples, [alpha, 1 - alpha], axis=0)
+            df['ci_low'] = low.ravel()
+            df['ci_high'] = high.ravel()
+        return df
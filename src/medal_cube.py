@@ -0,0 +1,137 @@
+# Import libraries
+import numpy as np  # linear algebra
+import pandas as pd  # data processing
+
+from medal_index import MedalIndex
+
+
+class MedalCube:
+    """
+    Sparse integer cube of medal row counts built once from a cleaned medal DataFrame.
+
+    Each dimension column is factorized to sorted integer codes and identical code combinations
+    are collapsed into one cell holding the number of rows. Filters are answered by a MedalIndex
+    over the cells and aggregating works on the small integer cell arrays, instead of scanning and
+    grouping the string columns of the full DataFrame.
+
+    Missing values get their own code (-1) in a dimension, so a row with a missing event title
+    still counts towards aggregates that do not use event_title, matching DataFrame.groupby.
+    """
+
+    # Dimension columns in the order they are stored
+    dimensions: list[str] = [
+        'game_season',
+        'country_name',
+        'discipline_title',
+        'event_title',
+        'event_gender',
+        'game_year',
+        'game_name',
+        'medal_type'
+    ]
+
+    def __init__(self, df: pd.DataFrame, count_col: str = 'participant_type'):
+        """
+        Builds the cube from the given DataFrame.
+
+        Parameters:
+            df (pd.DataFrame): The cleaned medal DataFrame. Only the dimensions present in its
+                columns are used.
+            count_col (str, optional): The column counted for each cell, rows where it is missing
+                are not counted (like groupby(...)[count_col].count()). Defaults to 'participant_type'.
+        """
+        self.dimensions = [dim for dim in self.dimensions if dim in df.columns]
+        df = df[df[count_col].notna()]
+
+        # Encode each dimension to sorted integer codes
+        self.labels: dict[str, pd.Index] = {}
+        row_codes = np.empty((len(df), len(self.dimensions)), dtype=np.int32)
+        for i, dim in enumerate(self.dimensions):
+            codes, uniques = pd.factorize(df[dim], sort=True)
+            row_codes[:, i] = codes
+            self.labels[dim] = pd.Index(uniques, name=dim)
+
+        # Collapse identical code combinations into cells with a row count
+        cell_codes, counts = np.unique(row_codes, axis=0, return_counts=True)
+        self.coords: dict[str, np.ndarray] = {
+            dim: cell_codes[:, i] for i, dim in enumerate(self.dimensions)}
+        self.counts: np.ndarray = counts.astype(np.int64)
+        self.index = MedalIndex.from_codes(self.coords, self.labels, len(self.counts))
+
+    def __len__(self) -> int:
+        """
+        Returns the number of non-empty cells.
+        """
+        return len(self.counts)
+
+    def _select(self, filters: dict, by: list[str]) -> np.ndarray:
+        """
+        Returns the positions of the cells matching all the filters where none of the by dimensions
+        is missing.
+        """
+        cells = self.index.positions(**filters)
+        for dim in by:
+            cells = cells[self.coords[dim][cells] >= 0]
+        return cells
+
+    def sum(self, by: list[str], **filters) -> pd.Series:
+        """
+        Sums the cells matching the filters, grouped by the given dimensions.
+
+        Example:
+        cube.sum(['game_year', 'medal_type'], country_name='Kenya', game_season='Summer')
+
+        Parameters:
+            by (list[str]): The dimensions to group by.
+            **filters: dimension=value pairs the cells must match, a list of values matches any of them.
+
+        Returns:
+            pd.Series: The row counts indexed by the observed values of the by dimensions, in sorted
+            order, like DataFrame.groupby(by)[count_col].count().
+        """
+        cells = self._select(filters, by)
+        if not by:
+            return pd.Series([self.counts[cells].sum()])
+
+        # Sum the matching cells per distinct combination of the by codes
+        codes = np.stack([self.coords[dim][cells] for dim in by], axis=1)
+        group_codes, inverse = np.unique(codes, axis=0, return_inverse=True)
+        totals = np.bincount(inverse.ravel(), weights=self.counts[cells], minlength=len(group_codes))
+        index = pd.MultiIndex.from_arrays(
+            [self.labels[dim].take(group_codes[:, i]) for i, dim in enumerate(by)], names=by)
+        if len(by) == 1:
+            index = index.get_level_values(0)
+        return pd.Series(totals.astype(np.int64), index=index)
+
+    def pivot(self, index: str, columns: str, **filters) -> pd.DataFrame:
+        """
+        Counts the cells matching the filters as a two dimensional table.
+
+        The result is the same as filtering the source DataFrame and running
+        df.groupby([index, columns])[count_col].count().reset_index().pivot(index=index, columns=columns):
+        only observed values make up the rows and columns, both sorted, and combinations without
+        medals are NaN.
+
+        Parameters:
+            index (str): The dimension used for the rows.
+            columns (str): The dimension used for the columns.
+            **filters: dimension=value pairs the cells must match, a list of values matches any of them.
+
+        Returns:
+            pd.DataFrame: The table of row counts.
+        """
+        cells = self._select(filters, [index, columns])
+        row_codes, row_pos = np.unique(self.coords[index][cells], return_inverse=True)
+        col_codes, col_pos = np.unique(self.coords[columns][cells], return_inverse=True)
+
+        # Scatter the cell counts into a dense rows x columns matrix
+        values = np.zeros((len(row_codes), len(col_codes)), dtype=np.int64)
+        np.add.at(values, (row_pos.ravel(), col_pos.ravel()), self.counts[cells])
+
+        # Combinations without medals are missing, as in a pivot
+        if (values == 0).any():
+            values = np.where(values > 0, values, np.nan)
+        return pd.DataFrame(
+            values,
+            index=self.labels[index].take(row_codes),
+            columns=self.labels[columns].take(col_codes))
@@ -0,0 +1,141 @@
+# Import libraries
+import numpy as np  # linear algebra
+import pandas as pd  # data processing
+
+
+class MedalIndex:
+    """
+    Multi-key lookup index over the rows of a medal DataFrame.
+
+    For every key column the row positions are stored grouped by value (sorted positions plus
+    offsets per value), so the rows for one value are found with a dictionary lookup and a slice.
+    A conjunction of filters intersects the position lists, starting from the shortest, instead
+    of building a boolean mask over every row for every column.
+    """
+
+    # Key columns indexed by default
+    keys: list[str] = [
+        'game_season',
+        'country_name',
+        'discipline_title',
+        'event_gender',
+        'medal_type',
+        'game_year'
+    ]
+
+    def __init__(self, df: pd.DataFrame, keys: list[str] | None = None):
+        """
+        Builds the index over the given DataFrame.
+
+        Parameters:
+            df (pd.DataFrame): The DataFrame to index.
+            keys (list[str], optional): The columns to index. Defaults to the keys attribute,
+                limited to the columns present in df.
+        """
+        keys = [key for key in (keys or self.keys) if key in df.columns]
+        codes = {}
+        labels = {}
+        for key in keys:
+            codes[key], labels[key] = pd.factorize(df[key], sort=True)
+        self._build(codes, labels, len(df))
+        self.df = df
+
+    @classmethod
+    def from_codes(cls, codes: dict[str, np.ndarray], labels: dict[str, pd.Index], size: int) -> 'MedalIndex':
+        """
+        Builds the index from already factorized columns, for example the cells of a MedalCube.
+
+        Parameters:
+            codes (dict[str, np.ndarray]): Integer codes per key, -1 for missing values.
+            labels (dict[str, pd.Index]): The value of each code per key.
+            size (int): The number of rows.
+
+        Returns:
+            MedalIndex: The index, without a DataFrame to select rows from.
+        """
+        index = cls.__new__(cls)
+        index._build(codes, labels, size)
+        index.df = None
+        return index
+
+    def _build(self, codes: dict[str, np.ndarray], labels: dict[str, pd.Index], size: int):
+        """
+        Groups the row positions of every key by code.
+        """
+        self.size = size
+        self.keys = list(codes)
+        self._positions: dict[str, np.ndarray] = {}
+        self._offsets: dict[str, np.ndarray] = {}
+        self._lookup: dict[str, dict] = {}
+        for key, key_codes in codes.items():
+            key_codes = np.asarray(key_codes)
+            is_valid = key_codes >= 0
+            # A stable sort keeps the positions of each value in ascending order
+            order = np.argsort(key_codes[is_valid], kind='stable')
+            self._positions[key] = np.flatnonzero(is_valid)[order]
+            self._offsets[key] = np.concatenate(
+                [[0], np.cumsum(np.bincount(key_codes[is_valid], minlength=len(labels[key])))])
+            self._lookup[key] = {value: code for code, value in enumerate(labels[key])}
+
+    def _value_positions(self, key: str, value) -> np.ndarray:
+        """
+        Returns the sorted row positions where the key column equals the value (or one of the values
+        if a list, tuple or set is given).
+        """
+        if isinstance(value, (list, tuple, set)):
+            parts = [self._value_positions(key, v) for v in value]
+            return np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+        code = self._lookup[key].get(value)
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        offsets = self._offsets[key]
+        return self._positions[key][offsets[code]:offsets[code + 1]]
+
+    def positions(self, **filters) -> np.ndarray:
+        """
+        Returns the sorted positions of the rows matching all the filters.
+
+        Example:
+        index.positions(game_season='Summer', country_name='Kenya', medal_type=['GOLD', 'SILVER'])
+
+        Parameters:
+            **filters: key=value pairs the rows must match. A list, tuple or set of values matches
+                any of them.
+
+        Returns:
+            np.ndarray: The matching row positions, all rows if no filters are given.
+
+        Raises:
+            KeyError: If a filter is not one of the indexed keys.
+        """
+        for key in filters:
+            if key not in self._lookup:
+                raise KeyError(f"'{key}' is not indexed, expected one of {self.keys}")
+        if not filters:
+            return np.arange(self.size)
+
+        # Intersect from the most selective filter so the intermediate results stay small
+        parts = sorted((self._value_positions(key, value) for key, value in filters.items()), key=len)
+        result = parts[0]
+        for part in parts[1:]:
+            if len(result) == 0:
+                break
+            result = np.intersect1d(result, part, assume_unique=True)
+        return result
+
+    def count(self, **filters) -> int:
+        """
+        Returns the number of rows matching all the filters.
+        """
+        return len(self.positions(**filters))
+
+    def select(self, **filters) -> pd.DataFrame:
+        """
+        Returns the rows of the indexed DataFrame matching all the filters, in their original order.
+
+        Raises:
+            ValueError: If the index was built with from_codes and has no DataFrame.
+        """
+        if self.df is None:
+            raise ValueError('This index was built from codes and has no DataFrame to select from')
+        return self.df.iloc[self.positions(**filters)]
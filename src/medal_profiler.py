@@ -0,0 +1,216 @@
+# Import libraries
+import functools
+import inspect
+import json
+import os
+import time
+
+import pandas as pd  # data processing
+
+
+def _frames(values) -> list[pd.DataFrame]:
+    """
+    Returns the DataFrames among the values, looking one level into tuples and lists.
+    """
+    frames = []
+    for value in values:
+        if isinstance(value, pd.DataFrame):
+            frames.append(value)
+        elif isinstance(value, (tuple, list)):
+            frames.extend(v for v in value if isinstance(v, pd.DataFrame))
+    return frames
+
+
+def _frame_stats(frames: list[pd.DataFrame]) -> tuple[int, int]:
+    """
+    Returns the total rows and memory of the frames. The memory is the shallow size (not following
+    Python string objects) to keep the overhead low.
+    """
+    return (sum(len(df) for df in frames),
+            int(sum(df.memory_usage(index=True, deep=False).sum() for df in frames)))
+
+
+class MedalProfiler:
+    """
+    Opt-in profiler recording every method call of one KaggleOlympicGamesMedals object.
+
+    The methods are wrapped on the object only (the class and other objects are not affected) until
+    uninstall is called or the with block ends. For each call it records the wall time, the time
+    spent in the method itself excluding the profiled methods it calls, the rows and memory of the
+    DataFrames passed in (before and after the call, as some methods modify them) and returned.
+
+    Generator methods such as iter_merged_results are timed while they are iterated, not when the
+    generator is created: the call is recorded when the generator is exhausted or closed, with the
+    time spent producing the items and the total rows and memory of the DataFrames it yielded. In
+    the trace it shows as one slice per produced item.
+
+    Example:
+    with MedalProfiler(ogm) as profiler:
+        ogm.plot_discipline_games_heatmap(ogm.get_medals_by_std_country_name(), 'Summer')
+    profiler.report()
+    profiler.write_trace('trace.json')
+    """
+
+    def __init__(self, obj, methods: list[str] | None = None):
+        """
+        Installs the profiling wrappers.
+
+        Parameters:
+            obj: The object to profile, usually a KaggleOlympicGamesMedals.
+            methods (list[str], optional): The methods to profile. Defaults to every public and
+                internal method defined by the class of obj.
+        """
+        self.obj = obj
+        self.methods = methods or [
+            name for name, member in inspect.getmembers(type(obj), inspect.isfunction)
+            if not (name.startswith('__') and name.endswith('__'))]
+        self.calls: list[dict] = []
+        self._stack: list[dict] = []
+        self._start = time.perf_counter()
+        for name in self.methods:
+            method = getattr(obj, name)
+            wrap = self._wrap_generator if inspect.isgeneratorfunction(method) else self._wrap
+            setattr(obj, name, wrap(name, method))
+
+    def __enter__(self) -> 'MedalProfiler':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.uninstall()
+
+    def uninstall(self):
+        """
+        Removes the wrappers, the recorded calls are kept.
+        """
+        for name in self.methods:
+            self.obj.__dict__.pop(name, None)
+
+    def reset(self):
+        """
+        Clears the recorded calls.
+        """
+        self.calls = []
+        self._start = time.perf_counter()
+
+    def _wrap(self, name: str, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            frames_in = _frames(list(args) + list(kwargs.values()))
+            rows_in, bytes_in = _frame_stats(frames_in)
+            call = {'method': name, 'depth': len(self._stack), 'child_seconds': 0.0}
+            self._stack.append(call)
+            start = time.perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                self._stack.pop()
+                if self._stack:
+                    self._stack[-1]['child_seconds'] += seconds
+            rows_out, bytes_out = _frame_stats(_frames([result]))
+            call.update(
+                start=start - self._start,
+                seconds=seconds,
+                self_seconds=seconds - call.pop('child_seconds'),
+                rows_in=rows_in,
+                rows_out=rows_out,
+                bytes_in=bytes_in,
+                bytes_in_after=_frame_stats(frames_in)[1],
+                bytes_out=bytes_out)
+            self.calls.append(call)
+            return result
+        return wrapper
+
+    def _wrap_generator(self, name: str, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            frames_in = _frames(list(args) + list(kwargs.values()))
+            rows_in, bytes_in = _frame_stats(frames_in)
+            call = {'method': name, 'depth': len(self._stack), 'child_seconds': 0.0}
+            slices, rows_out, bytes_out = [], 0, 0
+            generator = method(*args, **kwargs)
+            try:
+                while True:
+                    # Only the time spent producing the next item counts, not the time of the consumer
+                    self._stack.append(call)
+                    start = time.perf_counter()
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                    finally:
+                        seconds = time.perf_counter() - start
+                        slices.append((start - self._start, seconds))
+                        self._stack.pop()
+                        if self._stack:
+                            self._stack[-1]['child_seconds'] += seconds
+                    rows, nbytes = _frame_stats(_frames([item]))
+                    rows_out += rows
+                    bytes_out += nbytes
+                    yield item
+            finally:
+                generator.close()
+                seconds = sum(seconds for _, seconds in slices)
+                call.update(
+                    start=slices[0][0] if slices else time.perf_counter() - self._start,
+                    seconds=seconds,
+                    self_seconds=seconds - call.pop('child_seconds'),
+                    rows_in=rows_in,
+                    rows_out=rows_out,
+                    bytes_in=bytes_in,
+                    bytes_in_after=_frame_stats(frames_in)[1],
+                    bytes_out=bytes_out,
+                    slices=slices)
+                self.calls.append(call)
+        return wrapper
+
+    def report(self) -> pd.DataFrame:
+        """
+        Returns the calls aggregated per method, sorted by self time.
+
+        Returns:
+            pd.DataFrame: One row per called method with 'calls', 'seconds' (including the profiled
+            methods it calls), 'self_seconds', 'max_seconds', 'rows_in', 'rows_out', 'bytes_in',
+            'bytes_in_after' and 'bytes_out' (totals over the calls).
+        """
+        columns = ['method', 'calls', 'seconds', 'self_seconds', 'max_seconds',
+                   'rows_in', 'rows_out', 'bytes_in', 'bytes_in_after', 'bytes_out']
+        if not self.calls:
+            return pd.DataFrame(columns=columns)
+        df = pd.DataFrame(self.calls)
+        df_report = df.groupby('method').agg(
+            calls=('seconds', 'size'),
+            seconds=('seconds', 'sum'),
+            self_seconds=('self_seconds', 'sum'),
+            max_seconds=('seconds', 'max'),
+            rows_in=('rows_in', 'sum'),
+            rows_out=('rows_out', 'sum'),
+            bytes_in=('bytes_in', 'sum'),
+            bytes_in_after=('bytes_in_after', 'sum'),
+            bytes_out=('bytes_out', 'sum'))
+        return df_report.sort_values('self_seconds', ascending=False).reset_index()[columns]
+
+    def trace(self) -> dict:
+        """
+        Returns the calls in the Chrome trace event format, which chrome://tracing and
+        https://ui.perfetto.dev display as a timeline of nested calls.
+        """
+        pid = os.getpid()
+        events = [{
+            'name': call['method'],
+            'ph': 'X',
+            'ts': round(start * 1e6, 3),
+            'dur': round(seconds * 1e6, 3),
+            'pid': pid,
+            'tid': 0,
+            'args': {key: call[key] for key in
+                     ['depth', 'self_seconds', 'rows_in', 'rows_out', 'bytes_in', 'bytes_in_after', 'bytes_out']}
+        } for call in self.calls for start, seconds in call.get('slices', [(call['start'], call['seconds'])])]
+        return {'traceEvents': sorted(events, key=lambda event: event['ts']), 'displayTimeUnit': 'ms'}
+
+    def write_trace(self, file_path: str):
+        """
+        Writes the trace of the calls to a JSON file.
+        """
+        with open(file_path, 'w') as f:
+            json.dump(self.trace(), f)
@@ -0,0 +1,336 @@
+# Import libraries
+import argparse
+import json
+import os
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd  # data processing
+
+from kaggle_olympic_games_medals import KaggleOlympicGamesMedals
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        'data', 'kaggle', 'olympic-games-medals')
+
+# Content types of the response formats
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'arrow': 'application/vnd.apache.arrow.stream'
+}
+
+
+def _to_json(df: pd.DataFrame) -> bytes:
+    """
+    Encodes the DataFrame as JSON in the 'split' orientation (columns, index and data rows) plus
+    the names of the index levels.
+    """
+    split = df.to_json(orient='split', date_format='iso')
+    return ('{"index_names":%s,%s' % (json.dumps(list(df.index.names)), split[1:])).encode()
+
+
+def _to_arrow(df: pd.DataFrame) -> bytes:
+    """
+    Encodes the DataFrame, its index first, as an Arrow IPC stream. Requires pyarrow.
+
+    The table is built column by column because some heatmaps have duplicate column names
+    (the same year in both seasons), which Arrow allows but Table.from_pandas does not.
+    """
+    import pyarrow as pa  # optional dependency, only needed for Arrow responses
+
+    df = df.reset_index(names=[name or 'index' for name in df.index.names])
+    table = pa.Table.from_arrays([pa.array(df.iloc[:, i]) for i in range(df.shape[1])],
+                                 names=[str(col) for col in df.columns])
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def read_response(body: bytes, format: str = 'json') -> pd.DataFrame:
+    """
+    Decodes a response of the query server to a DataFrame.
+
+    Parameters:
+        body (bytes): The response body.
+        format (str, optional): The response format, 'json' or 'arrow'. Defaults to 'json'.
+
+    Returns:
+        pd.DataFrame: The result. Arrow responses have the index as leading columns.
+    """
+    if format == 'arrow':
+        import pyarrow as pa  # optional dependency, only needed for Arrow responses
+        return pa.ipc.open_stream(body).read_all().to_pandas()
+    payload = json.loads(body)
+    index = pd.MultiIndex.from_tuples(payload['index'], names=payload['index_names']) \
+        if len(payload['index_names']) > 1 else pd.Index(payload['index'], name=payload['index_names'][0])
+    return pd.DataFrame(payload['data'], index=index, columns=payload['columns'])
+
+
+def query(url: str, endpoint: str, format: str = 'json', timeout: float = 30, **params) -> pd.DataFrame:
+    """
+    Queries a running MedalQueryServer.
+
+    Example:
+    query('http://127.0.0.1:8050', 'country_medal_heatmap', country='Kenya', season='Summer')
+
+    Parameters:
+        url (str): The server URL.
+        endpoint (str): The endpoint, one of MedalQueryServer.endpoints.
+        format (str, optional): The response format, 'json' or 'arrow'. Defaults to 'json'.
+        timeout (float, optional): The request timeout in seconds. Defaults to 30.
+        **params: The parameters of the endpoint.
+
+    Returns:
+        pd.DataFrame: The result.
+    """
+    params = urllib.parse.urlencode({**params, 'format': format})
+    with urllib.request.urlopen(f'{url.rstrip("/")}/{endpoint}?{params}', timeout=timeout) as response:
+        return read_response(response.read(), format)
+
+
+class MedalQueryServer(ThreadingHTTPServer):
+    """
+    Local HTTP server answering medal queries from one warm KaggleOlympicGamesMedals object.
+
+    The datasets are loaded, merged and cleaned once at startup, so each query only runs the getter
+    on the frames kept in memory. Every endpoint is a GET request, for example
+    /country_medal_heatmap?country=Kenya&season=Summer&format=arrow. GET / lists the endpoints and
+    their parameters and GET /stats returns the request and cache counters.
+
+    Requests are handled in threads. Encoded responses are kept in an in-memory LRU cache shared by
+    the threads, so repeated queries are answered without running the getter again. The getters share
+    the cached frames of the object and are run one at a time.
+
+    Example:
+    server = MedalQueryServer(KaggleOlympicGamesMedals(data_dir), port=8050)
+    server.serve_forever()
+    """
+
+    # Endpoints: the getter, its required and optional parameters and whether it takes the
+    # standardized medals DataFrame as first argument
+    endpoints: dict[str, dict] = {
+        'medals_by_country': {'method': 'get_medals_by_country'},
+        'medals_by_std_country_name': {'method': 'get_medals_by_std_country_name'},
+        'hosts_with_country_codes': {'method': 'get_hosts_with_country_codes'},
+        'country_name_codes': {'method': 'get_country_name_codes'},
+        'discipline_game_heatmap': {
+            'method': 'get_discipline_game_heatmap',
+            'params': ['season'],
+            'medals': True
+        },
+        'country_medal_heatmap': {
+            'method': 'get_country_medal_heatmap',
+            'params': ['country'],
+            'optional_params': ['season'],
+            'medals': True
+        },
+        'country_discipline_gender_medal_heatmap': {
+            'method': 'get_country_discipline_gender_medal_heatmap',
+            'params': ['season', 'country', 'discipline', 'gender'],
+            'medals': True
+        }
+    }
+
+    # Encoders of the response formats
+    encoders = {
+        'json': _to_json,
+        'arrow': _to_arrow
+    }
+
+    # Medal cube dimensions of the heatmap parameters, whose values are checked against the data
+    param_dimensions = {
+        'season': 'game_season',
+        'country': 'country_name',
+        'discipline': 'discipline_title',
+        'gender': 'event_gender'
+    }
+
+    # Threads of pending requests do not keep the server from exiting
+    daemon_threads = True
+
+    def __init__(
+            self,
+            ogm: KaggleOlympicGamesMedals,
+            host: str = '127.0.0.1',
+            port: int = 8050,
+            max_cached_results: int = 256,
+            verbose: bool = False):
+        """
+        Loads and cleans the data, then binds the server.
+
+        Parameters:
+            ogm (KaggleOlympicGamesMedals): The object answering the queries.
+            host (str, optional): The address to listen on. Defaults to '127.0.0.1' (local only).
+            port (int, optional): The port, 0 picks a free one (see server_address). Defaults to 8050.
+            max_cached_results (int, optional): The number of encoded responses kept in memory.
+                Defaults to 256.
+            verbose (bool, optional): Whether to log every request to stderr. Defaults to False.
+        """
+        self.ogm = ogm
+        self.max_cached_results = max_cached_results
+        self.verbose = verbose
+        self._results: OrderedDict[tuple, bytes] = OrderedDict()
+        self._results_lock = threading.Lock()
+        self._ogm_lock = threading.Lock()
+        self.stats = {'requests': 0, 'cache_hits': 0, 'errors': 0, 'startup_seconds': 0.0}
+
+        # Warm up: build every derived frame the endpoints use
+        start = time.perf_counter()
+        self.df_medals = ogm.get_medals_by_std_country_name()
+        ogm.get_medal_cube(self.df_medals)
+        ogm.get_country_name_codes()
+        ogm.get_hosts_with_country_codes()
+        self.stats['startup_seconds'] = round(time.perf_counter() - start, 3)
+        super().__init__((host, port), _MedalQueryHandler)
+
+    def describe(self) -> dict:
+        """
+        Returns the endpoints with their required and optional parameters.
+        """
+        return {name: {'params': endpoint.get('params', []),
+                       'optional_params': endpoint.get('optional_params', []) + ['format']}
+                for name, endpoint in self.endpoints.items()}
+
+    def query(self, endpoint: str, params: dict, format: str = 'json') -> bytes:
+        """
+        Returns the encoded result of an endpoint, from the result cache when it has been computed before.
+
+        Parameters:
+            endpoint (str): The endpoint name, one of endpoints.
+            params (dict): The parameters of the endpoint.
+            format (str, optional): The response format, one of encoders. Defaults to 'json'.
+
+        Returns:
+            bytes: The encoded result.
+
+        Raises:
+            KeyError: If the endpoint is unknown.
+            ValueError: If the format is unknown, a parameter is missing or unknown, or a season,
+                country, discipline or gender has no medals.
+        """
+        spec = self.endpoints[endpoint]
+        if format not in self.encoders:
+            raise ValueError(f"Unknown format '{format}', expected one of {list(self.encoders)}")
+        required, optional = spec.get('params', []), spec.get('optional_params', [])
+        missing = [name for name in required if name not in params]
+        unknown = [name for name in params if name not in required + optional]
+        if missing or unknown:
+            raise ValueError(f'Missing parameters {missing}, unknown parameters {unknown}, '
+                             f'expected {required} and optionally {optional}')
+        if spec.get('medals'):
+            with self._ogm_lock:
+                labels = self.ogm.get_medal_cube(self.df_medals).labels
+            for name, value in params.items():
+                dim = self.param_dimensions.get(name)
+                if dim is not None and value not in labels[dim]:
+                    raise ValueError(f"No medals with {dim} '{value}'")
+
+        key = (endpoint, format, tuple(sorted(params.items())))
+        with self._results_lock:
+            body = self._results.get(key)
+            if body is not None:
+                self._results.move_to_end(key)
+                self.stats['cache_hits'] += 1
+                return body
+
+        args = [self.df_medals] if spec.get('medals') else []
+        with self._ogm_lock:
+            df = getattr(self.ogm, spec['method'])(*args, **params)
+        body = self.encoders[format](df)
+
+        with self._results_lock:
+            self._results[key] = body
+            if len(self._results) > self.max_cached_results:
+                self._results.popitem(last=False)
+        return body
+
+    def count(self, name: str):
+        """
+        Increments one of the stats counters.
+        """
+        with self._results_lock:
+            self.stats[name] += 1
+
+    def clear_results(self):
+        """
+        Empties the result cache, for example after changing a mapping table of the object
+        (call ogm.invalidate_cache as well).
+        """
+        with self._results_lock:
+            self._results.clear()
+
+
+class _MedalQueryHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of MedalQueryServer.
+    """
+
+    server: MedalQueryServer
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        endpoint = url.path.strip('/')
+        params = {name: values[-1] for name, values in urllib.parse.parse_qs(url.query).items()}
+        format = params.pop('format', 'json')
+        self.server.count('requests')
+        try:
+            if endpoint == '':
+                self._send(200, json.dumps(self.server.describe()).encode())
+            elif endpoint == 'stats':
+                stats = {**self.server.stats, 'cached_results': len(self.server._results)}
+                self._send(200, json.dumps(stats).encode())
+            elif endpoint not in self.server.endpoints:
+                self._send_error(404, f"Unknown endpoint '{endpoint}', expected one of {list(self.server.endpoints)}")
+            else:
+                self._send(200, self.server.query(endpoint, params, format), CONTENT_TYPES[format])
+        except (KeyError, ValueError) as e:
+            # Missing or unknown parameters, unknown formats, or values without medals
+            self._send_error(400, f'{type(e).__name__}: {e}')
+        except ImportError as e:
+            self._send_error(501, str(e))
+        except Exception as e:
+            # Any other failure of a getter still gets a response
+            self._send_error(500, f'{type(e).__name__}: {e}')
+
+    def _send(self, status: int, body: bytes, content_type: str = CONTENT_TYPES['json']):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str):
+        self.server.count('errors')
+        self._send(status, json.dumps({'error': message}).encode())
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve medal queries from data loaded and cleaned once.')
+    parser.add_argument('--data-dir', default=DATA_DIR, help='directory of the Olympic CSV files')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    parser.add_argument('--port', type=int, default=8050, help='port to listen on')
+    parser.add_argument('--compact', action='store_true', help='store the categorical columns compactly')
+    parser.add_argument('--result-cache-dir', default=None, help='directory of a persistent result cache')
+    parser.add_argument('--max-cached-results', type=int, default=256, help='responses kept in memory')
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args()
+
+    server = MedalQueryServer(
+        KaggleOlympicGamesMedals(args.data_dir, compact=args.compact, result_cache_dir=args.result_cache_dir),
+        args.host, args.port, args.max_cached_results, args.verbose)
+    print(f'Serving on http://{server.server_address[0]}:{server.server_address[1]} '
+          f'(started in {server.stats["startup_seconds"]} s)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
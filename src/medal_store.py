@@ -0,0 +1,201 @@
+# Import libraries
+import glob
+import os
+import sqlite3  # local database file
+from contextlib import closing
+
+import pandas as pd  # data processing, SQL I/O
+
+
+class MedalStore:
+    """
+    Local SQLite database of the cleaned medals, the hosts with country codes and the ETL tables.
+
+    The database is written once from a KaggleOlympicGamesMedals object, after which tools read
+    the slices they need with query, the filters and group-bys running in SQLite on indexed columns,
+    without loading and cleaning the full history.
+
+    Tables:
+    - medals: get_medals_by_std_country_name(), one row per medal with standardized country names
+    - medals_by_country: get_medals_by_country(), with the Olympic team names
+    - hosts: get_hosts_with_country_codes()
+    - one table per CSV file of the ETL directory, named after the file with the etl_table_prefix,
+      for example etl_merged_medal_hap_nut_gdp_by_country
+
+    Example:
+    store = MedalStore('data/medals.sqlite')
+    store.query(group_by=['game_year', 'medal_type'], country_name='Kenya', game_season='Summer')
+    """
+
+    # Columns indexed in every table that has them
+    index_cols: list[str] = [
+        'country_name',
+        'country_3_letter_code',
+        'country_code',
+        'slug_game',
+        'game_slug',
+        'game_name',
+        'game_year',
+        'game_season',
+        'discipline_title',
+        'event_gender'
+    ]
+
+    # Prefix of the ETL tables, keeping them apart from the tables of the same name written from
+    # the object (data/etl/medals_by_country.csv is an aggregate, not get_medals_by_country())
+    etl_table_prefix = 'etl_'
+
+    # Aggregate functions allowed in query
+    agg_funcs: list[str] = ['count', 'sum', 'avg', 'min', 'max']
+
+    def __init__(self, db_path: str):
+        """
+        Opens the store at the given path, the database is created by write.
+
+        Parameters:
+            db_path (str): The path of the SQLite database file.
+        """
+        self.db_path = db_path
+
+    def _connect(self) -> closing:
+        """
+        Opens a read-only connection, the database must exist.
+        """
+        if not os.path.exists(self.db_path):
+            raise FileNotFoundError(f'No medal store at {self.db_path}, create it with write first')
+        return closing(sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True))
+
+    def write(self, ogm, etl_dir: str | None = None) -> dict[str, int]:
+        """
+        Writes the database, replacing any previous one.
+
+        The database is built in a temporary file and moved into place, so readers never see a
+        partially written store.
+
+        Parameters:
+            ogm (KaggleOlympicGamesMedals): The object the medals and hosts are taken from.
+            etl_dir (str, optional): The directory of the ETL CSV files to add, for example data/etl.
+                Defaults to None (no ETL tables).
+
+        Returns:
+            dict[str, int]: The number of rows of each table.
+        """
+        frames = {
+            'medals': ogm.get_medals_by_std_country_name(),
+            'medals_by_country': ogm.get_medals_by_country(),
+            'hosts': ogm.get_hosts_with_country_codes()
+        }
+        if etl_dir is not None:
+            for csv_path in sorted(glob.glob(f'{etl_dir}/*.csv')):
+                table = self.etl_table_prefix + os.path.splitext(os.path.basename(csv_path))[0]
+                frames[table] = pd.read_csv(csv_path)
+
+        tmp_path = f'{self.db_path}.{os.getpid()}.tmp'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with closing(sqlite3.connect(tmp_path)) as con:
+            for table, df in frames.items():
+                df.to_sql(table, con, index=False)
+                for col in self.index_cols:
+                    if col in df.columns:
+                        con.execute(f'CREATE INDEX "ix_{table}_{col}" ON "{table}" ("{col}")')
+            # Statistics for the query planner to choose between the indexes
+            con.execute('ANALYZE')
+            con.commit()
+        os.replace(tmp_path, self.db_path)
+        return {table: len(df) for table, df in frames.items()}
+
+    def tables(self) -> dict[str, list[str]]:
+        """
+        Returns the columns of each table.
+        """
+        with self._connect() as con:
+            names = [row[0] for row in con.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+            return {name: [row[1] for row in con.execute(f'PRAGMA table_info("{name}")')] for name in names}
+
+    def query(
+            self,
+            table: str = 'medals',
+            columns: list[str] | None = None,
+            group_by: list[str] | None = None,
+            aggregates: dict[str, tuple[str, str]] | None = None,
+            order_by: list[str] | None = None,
+            limit: int | None = None,
+            **filters) -> pd.DataFrame:
+        """
+        Reads the rows of a table matching the filters, optionally grouped and aggregated, in SQLite.
+
+        Parameters:
+            table (str, optional): The table. Defaults to 'medals'.
+            columns (list[str], optional): The columns to read without group_by. Defaults to all columns.
+            group_by (list[str], optional): The columns to group by. Defaults to None (no grouping).
+            aggregates (dict[str, tuple[str, str]], optional): The aggregate columns with group_by, as
+                {name: (function, column)} with a function of agg_funcs and '*' for count(*).
+                Defaults to 'medal_count', the count of participant_type like the medal aggregates
+                (count(*) for tables without it).
+            order_by (list[str], optional): The sort columns. Defaults to the group_by columns.
+            limit (int, optional): The maximum number of rows. Defaults to None (all rows).
+            **filters: Column values to keep, a list keeps any of its values and None keeps missing values,
+                for example country_name='Kenya', medal_type=['GOLD', 'SILVER'].
+
+        Returns:
+            pd.DataFrame: The matching rows, or one row per group with the group_by and aggregate columns.
+
+        Raises:
+            ValueError: If the table, a column or an aggregate function is unknown.
+        """
+        tables = self.tables()
+        if table not in tables:
+            raise ValueError(f"Unknown table '{table}', expected one of {list(tables)}")
+        table_cols = tables[table]
+
+        def check(cols) -> list[str]:
+            # Names are quoted into the SQL, so only known columns are accepted
+            unknown = [col for col in cols if col not in table_cols]
+            if unknown:
+                raise ValueError(f"Unknown columns {unknown} of table '{table}', expected some of {table_cols}")
+            return [f'"{col}"' for col in cols]
+
+        where, params = [], []
+        for col, value in filters.items():
+            name = check([col])[0]
+            if value is None:
+                where.append(f'{name} IS NULL')
+            elif isinstance(value, (list, tuple, set)):
+                where.append(f'{name} IN ({", ".join("?" * len(value))})')
+                params.extend(value)
+            else:
+                where.append(f'{name} = ?')
+                params.append(value)
+
+        if group_by:
+            if aggregates is None:
+                aggregates = {'medal_count': ('count', 'participant_type' if 'participant_type' in table_cols else '*')}
+            select = check(group_by)
+            for name, (func, col) in aggregates.items():
+                if '"' in name:
+                    raise ValueError(f'Invalid aggregate column name {name!r}')
+                if func.lower() not in self.agg_funcs:
+                    raise ValueError(f"Unknown aggregate function '{func}', expected one of {self.agg_funcs}")
+                arg = '*' if col == '*' else check([col])[0]
+                select.append(f'{func.upper()}({arg}) AS "{name}"')
+            order_by = order_by or group_by
+        else:
+            select = check(columns) if columns else ['*']
+
+        sql = f'SELECT {", ".join(select)} FROM "{table}"'
+        if where:
+            sql += f' WHERE {" AND ".join(where)}'
+        if group_by:
+            sql += f' GROUP BY {", ".join(check(group_by))}'
+        if order_by:
+            # Aggregate columns can be sorted by too
+            order = [f'"{col}"' if group_by and col in aggregates else check([col])[0] for col in order_by]
+            sql += f' ORDER BY {", ".join(order)}'
+        if limit is not None:
+            sql += f' LIMIT {int(limit)}'
+
+        with self._connect() as con:
+            return pd.read_sql_query(sql, con, params=params)
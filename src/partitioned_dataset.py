@@ -0,0 +1,85 @@
+# Import libraries
+import os
+import shutil
+
+import pandas as pd  # data processing
+import pyarrow as pa  # columnar tables
+import pyarrow.dataset as ds  # partitioned Parquet datasets
+
+# Columns the medal datasets are partitioned by
+PARTITION_COLS = ['game_season', 'game_year']
+
+
+def write_partitioned(
+        df: pd.DataFrame,
+        output_dir: str,
+        partition_cols: list[str] | None = None,
+        compression: str = 'zstd',
+        threads: bool = True) -> list[str]:
+    """
+    Writes the DataFrame as a Parquet dataset with one directory per partition value, for example
+    output_dir/game_season=Winter/game_year=2010/part-0.parquet, replacing any previous dataset.
+
+    String columns are dictionary encoded. The dataset is written to a temporary directory next to
+    output_dir and moved into place, so readers do not see a partially written dataset.
+
+    Parameters:
+        df (pd.DataFrame): The DataFrame, with the partition columns.
+        output_dir (str): The directory of the dataset.
+        partition_cols (list[str], optional): The partition columns, in directory order.
+            Defaults to PARTITION_COLS (the ones present in df).
+        compression (str, optional): The Parquet compression codec. Defaults to 'zstd'.
+        threads (bool, optional): Whether to write the partitions in parallel threads. Defaults to True.
+
+    Returns:
+        list[str]: The paths of the written files, relative to output_dir.
+    """
+    partition_cols = [col for col in partition_cols or PARTITION_COLS if col in df.columns]
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    file_options = ds.ParquetFileFormat().make_write_options(compression=compression, use_dictionary=True)
+    tmp_dir = f'{output_dir.rstrip("/")}.{os.getpid()}.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    paths = []
+    ds.write_dataset(
+        table, tmp_dir,
+        format='parquet',
+        partitioning=partition_cols or None,
+        partitioning_flavor='hive' if partition_cols else None,
+        file_options=file_options,
+        use_threads=threads,
+        # Keep the row order of df within each partition
+        preserve_order=True,
+        file_visitor=lambda written: paths.append(os.path.relpath(written.path, tmp_dir)))
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(tmp_dir, output_dir)
+    return sorted(paths)
+
+
+def read_partitioned(dataset_dir: str, columns: list[str] | None = None, **filters) -> pd.DataFrame:
+    """
+    Reads the rows of a dataset written by write_partitioned matching the filters.
+
+    Only the partitions matching the filters on partition columns are opened, and only the requested
+    columns are read. Filters on other columns skip the row groups whose statistics exclude them.
+
+    Example:
+    read_partitioned('data/parquet/medals', game_season='Winter', game_year=range(2010, 2023))
+
+    Parameters:
+        dataset_dir (str): The directory of the dataset.
+        columns (list[str], optional): The columns to read. Defaults to all columns.
+        **filters: column=value pairs the rows must match, a list (or range) matches any of its values.
+
+    Returns:
+        pd.DataFrame: The matching rows, partition by partition.
+    """
+    dataset = ds.dataset(dataset_dir, format='parquet',
+                         partitioning=ds.HivePartitioning.discover())
+    expression = None
+    for col, value in filters.items():
+        if isinstance(value, (list, tuple, set, range)):
+            condition = ds.field(col).isin(list(value))
+        else:
+            condition = ds.field(col) == value
+        expression = condition if expression is None else expression & condition
+    return dataset.to_table(columns=columns, filter=expression).to_pandas()
@@ -0,0 +1,161 @@
+# Import libraries
+import hashlib  # cache keys
+import json
+import os
+
+import pandas as pd  # data processing, Parquet file I/O (requires pyarrow)
+
+
+class ResultCache:
+    """
+    On-disk cache of DataFrame results, one Parquet file per entry named by the hash of its key.
+
+    The key is made of any JSON serializable parts, for example the method name, its arguments and
+    a fingerprint of the data and mapping tables the result is computed from, so a changed input
+    never hits a stale entry. Entries are never updated, only written once and evicted.
+
+    The total size of the entries is bounded by max_bytes: when the cache is opened and after each
+    write, the least recently used entries (by file modification time, refreshed on every hit) are
+    deleted until the cache fits.
+    Several processes can share the directory: entries are written to a temporary file and renamed
+    into place, and an entry deleted by another process is a miss.
+    """
+
+    # Suffix of the entry files
+    file_suffix = '.parquet'
+
+    # DataFrame attribute holding the column labels, Parquet needs unique string column names
+    columns_attr = 'result_cache_columns'
+
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 2**20):
+        """
+        Initializes the cache, creating the directory if needed.
+
+        Parameters:
+            cache_dir (str): The directory of the entry files.
+            max_bytes (int, optional): The maximum total size of the entry files. Defaults to 256 MiB.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self.evict()
+
+    @staticmethod
+    def key(*parts) -> str:
+        """
+        Returns the SHA-256 hash of the JSON serializable key parts.
+        """
+        text = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return f'{self.cache_dir}/{key}{self.file_suffix}'
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        """
+        Returns the cached DataFrame of the key, or None if there is no entry.
+        """
+        path = self._path(key)
+        try:
+            df = pd.read_parquet(path)
+            # Mark the entry as recently used
+            os.utime(path)
+        except (OSError, ValueError):
+            # Missing, or evicted by another process while reading
+            self.misses += 1
+            return None
+        columns = df.attrs.pop(self.columns_attr)
+        for i in columns['object_categories']:
+            # Parquet reads the categories of categoricals back as strings
+            categories = df.iloc[:, i].cat.categories.astype(object)
+            df.isetitem(i, df.iloc[:, i].cat.set_categories(categories))
+        df.columns = pd.Index(columns['labels'], name=columns['name'])
+        self.hits += 1
+        return df
+
+    def put(self, key: str, df: pd.DataFrame):
+        """
+        Stores the DataFrame under the key, then evicts the least recently used entries over max_bytes.
+        """
+        # Store the columns by position, with their labels as an attribute
+        df_entry = df.set_axis([str(i) for i in range(df.shape[1])], axis=1)
+        object_categories = [i for i, dtype in enumerate(df.dtypes)
+                             if isinstance(dtype, pd.CategoricalDtype) and dtype.categories.dtype == object]
+        df_entry.attrs = {self.columns_attr: {
+            'labels': list(df.columns), 'name': df.columns.name, 'object_categories': object_categories}}
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        df_entry.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def get_or_build(self, key: str, build) -> pd.DataFrame:
+        """
+        Returns the cached DataFrame of the key, building and storing it on a miss.
+
+        Parameters:
+            key (str): The key, as returned by key().
+            build (Callable[[], pd.DataFrame]): Function that computes the DataFrame.
+        """
+        df = self.get(key)
+        if df is None:
+            df = build()
+            self.put(key, df)
+        return df
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        """
+        Returns the modification time, size and path of every entry file.
+        """
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(self.file_suffix):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self) -> int:
+        """
+        Deletes the least recently used entries until the total size is at most max_bytes.
+
+        Returns:
+            int: The number of deleted entries.
+        """
+        entries = self._entries()
+        size = sum(entry[1] for entry in entries)
+        deleted = 0
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                deleted += 1
+            except FileNotFoundError:
+                # Already evicted by another process
+                pass
+            size -= entry_size
+        return deleted
+
+    def clear(self):
+        """
+        Deletes every entry.
+        """
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def size(self) -> tuple[int, int]:
+        """
+        Returns the number of entries and their total size in bytes.
+        """
+        entries = self._entries()
+        return len(entries), sum(entry[1] for entry in entries)
@@ -0,0 +1,217 @@
+# Import libraries
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import shared_memory  # zero-copy frames for worker processes
+
+import numpy as np  # linear algebra
+import pandas as pd  # data processing
+
+# Frames attached by the worker processes of SharedMedalFrames.map_keys, by name, and their
+# memory blocks, kept open for the life of the worker
+_worker_frames: dict[str, pd.DataFrame] = {}
+_worker_blocks: list[shared_memory.SharedMemory] = []
+
+
+class SharedFrameHandle:
+    """
+    Picklable description of a DataFrame published in shared memory: the name of the memory block
+    and the dtype, offset and categories of every column. It is only a few KB however large the
+    frame, so it is what gets sent to the worker processes.
+    """
+
+    def __init__(self, shm_name: str, n_rows: int, columns: list[tuple], index: tuple | None):
+        self.shm_name = shm_name
+        self.n_rows = n_rows
+        # (name, dtype, offset, categories or None) per column
+        self.columns = columns
+        # (name, dtype, offset) of an integer index, None for a RangeIndex starting at 0
+        self.index = index
+
+
+def _encode_column(values: pd.Series) -> tuple[np.ndarray, pd.Index | None]:
+    """
+    Returns the array stored for a column and its categories: numbers and dates are stored as
+    they are, every other column as categorical codes (-1 for missing values).
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    if isinstance(values.dtype, np.dtype) and values.dtype.kind in 'biufM':
+        return values.to_numpy(), None
+    codes, categories = pd.factorize(values, sort=True)
+    # Same code width as pandas categoricals, so attaching does not convert the codes
+    codes = pd.Categorical.from_codes(codes, categories).codes
+    return codes, categories
+
+
+def publish_frame(df: pd.DataFrame) -> tuple[shared_memory.SharedMemory, SharedFrameHandle]:
+    """
+    Copies the DataFrame into one new shared memory block.
+
+    Parameters:
+        df (pd.DataFrame): The DataFrame, with unique column names and an integer index.
+
+    Returns:
+        tuple[SharedMemory, SharedFrameHandle]: The memory block, to be closed and unlinked by the
+        owner, and the handle to attach to it.
+    """
+    arrays, columns, offset = [], [], 0
+
+    def place(array: np.ndarray) -> int:
+        nonlocal offset
+        # Align every column to 64 bytes (a cache line)
+        start = -(-offset // 64) * 64
+        offset = start + array.nbytes
+        arrays.append((start, array))
+        return start
+
+    for col in df.columns:
+        array, categories = _encode_column(df[col])
+        columns.append((col, array.dtype.str, place(array), categories))
+    index = None
+    if not (isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1):
+        index_values = df.index.to_numpy()
+        if index_values.dtype.kind not in 'iu':
+            raise ValueError('Only DataFrames with an integer index can be published')
+        index = (df.index.name, index_values.dtype.str, place(index_values))
+
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for start, array in arrays:
+        np.ndarray(array.shape, array.dtype, buffer=shm.buf, offset=start)[:] = array
+    return shm, SharedFrameHandle(shm.name, len(df), columns, index)
+
+
+def attach_frame(handle: SharedFrameHandle) -> tuple[shared_memory.SharedMemory, pd.DataFrame]:
+    """
+    Returns a read-only DataFrame whose columns are views of the shared memory, without copying.
+
+    Parameters:
+        handle (SharedFrameHandle): The handle returned by publish_frame.
+
+    Returns:
+        tuple[SharedMemory, pd.DataFrame]: The memory block, to keep open while the DataFrame is used,
+        and the DataFrame.
+    """
+    if sys.version_info >= (3, 13):
+        # The owner unlinks the block, attaching processes must not track it
+        shm = shared_memory.SharedMemory(name=handle.shm_name, track=False)
+    else:
+        shm = shared_memory.SharedMemory(name=handle.shm_name)
+
+    def view(dtype: str, offset: int) -> np.ndarray:
+        array = np.ndarray((handle.n_rows,), np.dtype(dtype), buffer=shm.buf, offset=offset)
+        array.flags.writeable = False
+        return array
+
+    data = {}
+    for col, dtype, offset, categories in handle.columns:
+        array = view(dtype, offset)
+        data[col] = array if categories is None else \
+            pd.Categorical.from_codes(array, categories=categories, validate=False)
+    index = None if handle.index is None else pd.Index(view(*handle.index[1:]), name=handle.index[0], copy=False)
+    return shm, pd.DataFrame(data, index=index, copy=False)
+
+
+def _init_worker(handles: dict[str, SharedFrameHandle]):
+    """
+    Attaches the frames once per worker process.
+    """
+    for name, handle in handles.items():
+        shm, _worker_frames[name] = attach_frame(handle)
+        _worker_blocks.append(shm)
+
+
+def _call(func, key):
+    """
+    Runs the user function on the attached frames of the worker.
+    """
+    return func(_worker_frames, key)
+
+
+class SharedMedalFrames:
+    """
+    Publishes the cleaned medal and host frames once into shared memory for process-pool analyses.
+
+    Workers attach to the frames read-only without copying them: string columns are stored as
+    categorical codes and every column is a view of the shared memory block, so publishing costs one
+    copy and each worker only receives a small handle instead of a pickled frame.
+
+    Example:
+    def kenya_like(frames, key):
+        ogm = KaggleOlympicGamesMedals(data_dir)
+        return ogm.get_country_medal_heatmap(frames['medals'], *key)
+
+    with SharedMedalFrames(ogm) as shared:
+        heatmaps = shared.map_keys(kenya_like, [('Kenya', 'Summer'), ('Norway', 'Winter')])
+
+    The function must be defined at module level so the workers can unpickle it.
+    """
+
+    def __init__(self, ogm=None, frames: dict[str, pd.DataFrame] | None = None):
+        """
+        Publishes the frames.
+
+        Parameters:
+            ogm (KaggleOlympicGamesMedals, optional): The object whose frames are published: 'medals'
+                (get_medals_by_std_country_name) and 'hosts' (get_hosts_with_country_codes).
+            frames (dict[str, pd.DataFrame], optional): More or other frames to publish by name.
+                Defaults to None.
+        """
+        if ogm is not None:
+            frames = {'medals': ogm.get_medals_by_std_country_name(),
+                      'hosts': ogm.get_hosts_with_country_codes(),
+                      **(frames or {})}
+        self._blocks: list[shared_memory.SharedMemory] = []
+        self.handles: dict[str, SharedFrameHandle] = {}
+        try:
+            for name, df in (frames or {}).items():
+                shm, self.handles[name] = publish_frame(df)
+                self._blocks.append(shm)
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self) -> 'SharedMedalFrames':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Frees the shared memory. Frames attached in other processes stay valid until they exit.
+        """
+        for shm in self._blocks:
+            try:
+                shm.close()
+            except BufferError:
+                # Frames attached in this process still use the block, it is freed when they are
+                pass
+            shm.unlink()
+        self._blocks = []
+
+    def nbytes(self) -> int:
+        """
+        Returns the size of the shared memory blocks.
+        """
+        return sum(shm.size for shm in self._blocks)
+
+    def map_keys(self, func, keys: list, processes: int | None = None, chunksize: int = 1) -> list:
+        """
+        Runs func(frames, key) for every key on a process pool, each worker attaching to the
+        shared frames once.
+
+        Parameters:
+            func (Callable[[dict[str, pd.DataFrame], object], object]): A module level function of the
+                attached frames by name and one key, for example a (country, season) tuple.
+            keys (list): The keys.
+            processes (int, optional): The number of worker processes. Defaults to None (the number of CPUs).
+            chunksize (int, optional): The number of keys sent to a worker at once. Defaults to 1.
+
+        Returns:
+            list: The results of the keys, in order.
+        """
+        processes = min(processes or os.cpu_count() or 1, max(len(keys), 1))
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(self.handles,)) as executor:
+            return list(executor.map(_call, repeat(func), keys, chunksize=chunksize))